@@ -0,0 +1,110 @@
+import math
+import pygame
+from constants import *
+
+class AudioManager:
+    """Plays sound effects through fixed pools of reserved mixer channels.
+    
+    Game code calls ``play(category)`` as often as it likes during a frame;
+    nothing reaches the mixer until ``flush()``. Repeated triggers of the same
+    category in one frame become a single voice, played louder, instead of
+    one voice each. A voice is dropped when its category's pool is busy or
+    ``max_voices`` effects are already playing.
+    """
+    def __init__(self, pools=SOUND_CHANNEL_POOLS, max_voices=SOUND_MAX_VOICES, volume=SOUND_VOLUME):
+        self.max_voices = max_voices
+        self.volume = volume
+        self.sounds = {}
+        self.channels = {}
+        self.pending = {}
+        
+        # Statistics
+        self.triggers = 0
+        self.voices_played = 0
+        self.voices_coalesced = 0
+        self.voices_dropped = 0
+        self.peak_voices = 0
+        
+        self.enabled = pygame.mixer.get_init() is not None
+        if self.enabled:
+            # Reserve the pooled channels so nothing else (e.g. Sound.play) can take them
+            total = sum(pools.values())
+            pygame.mixer.set_num_channels(max(total, pygame.mixer.get_num_channels()))
+            pygame.mixer.set_reserved(total)
+            first = 0
+            for category, count in pools.items():
+                self.channels[category] = [pygame.mixer.Channel(i) for i in range(first, first + count)]
+                first += count
+        self.set_volume(volume)
+    
+    def load(self, category, path):
+        """Load the sound for a category; missing or broken files leave it silent"""
+        if not (self.enabled and path and category in self.channels):
+            return
+        try:
+            self.sounds[category] = pygame.mixer.Sound(path)
+        except Exception as e:
+            print(f"Warning: Sound {path} could not be loaded: {e}")
+    
+    def play(self, category):
+        """Queue a sound for this frame; repeats before the next flush() are merged"""
+        if category in self.sounds:
+            self.triggers += 1
+            self.pending[category] = self.pending.get(category, 0) + 1
+    
+    def flush(self):
+        """Start one voice per category triggered since the last flush"""
+        if not self.pending:
+            return
+        playing = self.voices_playing()
+        # Pools are listed highest priority first, so important sounds get voices first
+        for category, channels in self.channels.items():
+            count = self.pending.get(category)
+            if not count:
+                continue
+            self.voices_coalesced += count - 1
+            channel = next((c for c in channels if not c.get_busy()), None)
+            if channel is None or playing >= self.max_voices:
+                self.voices_dropped += 1
+                continue
+            channel.play(self.sounds[category])
+            # Merged triggers are played louder rather than stacked
+            channel.set_volume(min(1.0, self.volume * math.sqrt(count)))
+            playing += 1
+            self.voices_played += 1
+        self.pending.clear()
+        self.peak_voices = max(self.peak_voices, playing)
+    
+    def voices_playing(self):
+        """Return how many pooled channels are currently busy"""
+        return sum(channel.get_busy() for channels in self.channels.values() for channel in channels)
+    
+    def set_volume(self, volume):
+        """Set the volume for music and every sound effect, including ones already playing"""
+        self.volume = min(1.0, max(0.0, volume))
+        if not self.enabled:
+            return
+        pygame.mixer.music.set_volume(self.volume)
+        for channels in self.channels.values():
+            for channel in channels:
+                channel.set_volume(self.volume)
+    
+    def change_volume(self, step):
+        """Raise or lower the volume by ``step``"""
+        self.set_volume(round(self.volume + step, 2))
+    
+    def stats(self):
+        """Return voice counters"""
+        return {
+            'triggers': self.triggers,
+            'played': self.voices_played,
+            'coalesced': self.voices_coalesced,
+            'dropped': self.voices_dropped,
+            'peak_voices': self.peak_voices,
+        }
+    
+    def report(self):
+        """Format the voice stats as a single human readable line"""
+        s = self.stats()
+        return (f"[audio] {s['triggers']} triggers: {s['played']} voices played, "
+                f"{s['coalesced']} coalesced, {s['dropped']} dropped, peak {s['peak_voices']} voices")
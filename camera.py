@@ -0,0 +1,40 @@
+import pygame
+from constants import *
+
+class Camera:
+    """Screen-sized view onto a larger world that follows the player.
+    
+    Entities keep world coordinates. Only what overlaps the cull rect (the
+    view grown by CAMERA_CULL_MARGIN on every side) is turned into
+    screen-space entries for drawing, so draw cost grows with what is on
+    screen rather than with the size of the world.
+    """
+    def __init__(self, world_size=(WORLD_WIDTH, WORLD_HEIGHT), screen_size=(SCREEN_WIDTH, SCREEN_HEIGHT),
+                 margin=CAMERA_CULL_MARGIN):
+        self.world = pygame.Rect((0, 0), world_size)
+        self.view = pygame.Rect((0, 0), screen_size)
+        self.margin = margin
+        self.cull = self.view.inflate(2 * margin, 2 * margin)
+    
+    def follow(self, rect):
+        """Center the view on a world-space rect, without showing anything outside the world"""
+        self.view.center = rect.center
+        self.view.clamp_ip(self.world)
+        self.cull = self.view.inflate(2 * self.margin, 2 * self.margin)
+    
+    def to_screen(self, rect):
+        """Return a copy of a world-space rect in screen coordinates"""
+        return rect.move(-self.view.x, -self.view.y)
+    
+    def entries(self, sprites):
+        """Return screen-space (image, rect) pairs for the sprites inside the cull rect"""
+        cull = self.cull
+        dx, dy = -self.view.x, -self.view.y
+        return tuple((sprite.image, sprite.rect.move(dx, dy)) for sprite in sprites
+                     if cull.colliderect(sprite.rect))
+    
+    def blits(self, blits):
+        """Return (image, position) pairs moved to screen space, dropping those outside the cull rect"""
+        cull = self.cull
+        left, top = self.view.topleft
+        return [(image, (x - left, y - top)) for image, (x, y) in blits if cull.collidepoint(x, y)]
@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import queue
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pygame
+from frame_stats import percentile
+
+def lower_priority():
+    """Run the calling encoder process at a lower CPU priority, where the platform allows it"""
+    if hasattr(os, 'nice'):
+        os.nice(10)
+
+def write_png(path, pixels, surface_format):
+    """Rebuild a surface from raw pixels and save it as a PNG (runs in an encoder process)"""
+    fmt = surface_format
+    frame = pygame.Surface((fmt['width'], fmt['height']), 0, fmt['bitsize'], fmt['masks'])
+    pitch = fmt['pitch']
+    if frame.get_pitch() == pitch:
+        frame.get_buffer().write(pixels)
+    else:
+        # Copy row by row if the new surface pads its rows differently
+        row_bytes = fmt['width'] * frame.get_bytesize()
+        buffer = frame.get_buffer()
+        for y in range(fmt['height']):
+            buffer.write(pixels[y * pitch:y * pitch + row_bytes], y * frame.get_pitch())
+    pygame.image.save(frame, path)
+
+class FrameCapture:
+    """Records presented frames to disk on a background writer thread.
+    
+    The main loop only takes a raw copy of the frame's pixel buffer (read
+    through a buffer view, with no format conversion) and hands it to a
+    bounded queue. If the writer falls behind and the queue is full, the
+    frame is dropped and counted instead of stalling the game.
+    
+    Formats:
+        'raw' - every frame appended to one frames.raw file, described by
+                frames.json (size, pitch, bit depth and channel masks)
+        'png' - a numbered PNG image sequence. pygame holds the GIL while
+                it encodes, so encoding runs in ``png_encoders`` separate
+                processes rather than on the writer thread.
+    """
+    def __init__(self, output_dir, capture_format='raw', queue_size=8, png_encoders=2):
+        if capture_format not in ('raw', 'png'):
+            raise ValueError(f"Unknown capture format: {capture_format}")
+        self.output_dir = output_dir
+        self.capture_format = capture_format
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.surface_format = None
+        
+        # Statistics
+        self.frames_captured = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.capture_time_total = 0.0
+        self.capture_time_max = 0.0
+        self.write_errors = 0
+        # Time between frames while capturing, to show capture's effect on the frame rate
+        self.frame_intervals = deque(maxlen=600)
+        self.last_capture = None
+        
+        os.makedirs(output_dir, exist_ok=True)
+        self.raw_file = None
+        self.encoder = None
+        self.encoder_count = png_encoders
+        if capture_format == 'raw':
+            self.raw_file = open(os.path.join(output_dir, 'frames.raw'), 'wb')
+        else:
+            # Spawn, not fork: the game process already has SDL and threads running.
+            # Encoders run at low priority so they only use CPU the game leaves idle.
+            self.encoder = ProcessPoolExecutor(max_workers=png_encoders,
+                                               mp_context=multiprocessing.get_context('spawn'),
+                                               initializer=lower_priority)
+        self.thread = threading.Thread(target=self._write_frames, name="capture-writer", daemon=True)
+        self.thread.start()
+    
+    def capture_frame(self, surface):
+        """Queue a copy of the surface's pixels for writing, or drop it if the writer is behind"""
+        start = time.perf_counter()
+        if self.last_capture is not None:
+            self.frame_intervals.append((start - self.last_capture) * 1000)
+        self.last_capture = start
+        if self.frames.full():
+            # Don't even copy the pixels if there is nowhere to put them
+            self.frames_dropped += 1
+        else:
+            if self.surface_format is None:
+                self.surface_format = self._describe(surface)
+            # The surface is redrawn next frame, so the buffer view is copied once here
+            pixels = surface.get_buffer().raw
+            try:
+                self.frames.put_nowait((self.frames_captured, pixels))
+                self.frames_captured += 1
+            except queue.Full:
+                self.frames_dropped += 1
+        elapsed = time.perf_counter() - start
+        self.capture_time_total += elapsed
+        self.capture_time_max = max(self.capture_time_max, elapsed)
+    
+    def _describe(self, surface):
+        """Record the pixel layout needed to decode captured frames"""
+        surface_format = {
+            'width': surface.get_width(),
+            'height': surface.get_height(),
+            'pitch': surface.get_pitch(),
+            'bitsize': surface.get_bitsize(),
+            'masks': list(surface.get_masks()),
+        }
+        if self.capture_format == 'raw':
+            with open(os.path.join(self.output_dir, 'frames.json'), 'w') as f:
+                json.dump(surface_format, f)
+        return surface_format
+    
+    def _write_frames(self):
+        """Writer thread: write queued frames until close() sends None"""
+        encoding = deque()  # (index, future) for PNGs being encoded
+        while True:
+            item = self.frames.get()
+            if item is None:
+                break
+            index, pixels = item
+            if self.raw_file:
+                try:
+                    self.raw_file.write(pixels)
+                    self.frames_written += 1
+                except Exception as e:
+                    self.write_errors += 1
+                    print(f"Error writing capture frame {index}: {e}")
+            else:
+                # Keep one frame per encoder in flight; waiting here lets the queue fill up
+                if len(encoding) >= self.encoder_count:
+                    self._finish_png(*encoding.popleft())
+                path = os.path.join(self.output_dir, f"frame_{index:06d}.png")
+                encoding.append((index, self.encoder.submit(write_png, path, pixels, self.surface_format)))
+        while encoding:
+            self._finish_png(*encoding.popleft())
+    
+    def _finish_png(self, index, future):
+        """Wait for one PNG to be encoded and count the result"""
+        try:
+            future.result()
+            self.frames_written += 1
+        except Exception as e:
+            self.write_errors += 1
+            print(f"Error writing capture frame {index}: {e}")
+    
+    def close(self):
+        """Finish writing queued frames and stop the writer thread"""
+        self.frames.put(None)
+        self.thread.join()
+        if self.raw_file:
+            self.raw_file.close()
+            self.raw_file = None
+        if self.encoder:
+            self.encoder.shutdown()
+            self.encoder = None
+    
+    def stats(self):
+        """Return capture counters, the main-loop cost per frame and the frame interval while capturing"""
+        attempts = self.frames_captured + self.frames_dropped
+        return {
+            'captured': self.frames_captured,
+            'written': self.frames_written,
+            'dropped': self.frames_dropped,
+            'write_errors': self.write_errors,
+            'capture_mean_ms': self.capture_time_total * 1000 / attempts if attempts else 0.0,
+            'capture_max_ms': self.capture_time_max * 1000,
+            'frame_interval_mean_ms': sum(self.frame_intervals) / len(self.frame_intervals) if self.frame_intervals else 0.0,
+            'frame_interval_p95_ms': percentile(self.frame_intervals, 0.95),
+        }
+    
+    def report(self):
+        """Format the capture stats as a single human readable line"""
+        s = self.stats()
+        return (f"[capture] {s['captured']} captured, {s['written']} written, {s['dropped']} dropped | "
+                f"main loop cost mean {s['capture_mean_ms']:.3f} ms, max {s['capture_max_ms']:.3f} ms | "
+                f"frames every {s['frame_interval_mean_ms']:.2f} ms, p95 {s['frame_interval_p95_ms']:.2f} ms "
+                f"while capturing")
@@ -5,6 +5,16 @@ SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 SCREEN_TITLE = "Space Invaders"
 FPS = 60
+WINDOW_SCALE = 1  # Window size as a multiple of the logical screen size
+FULLSCREEN = False
+USE_SCALED_DISPLAY = False  # Let pygame.SCALED upscale the logical screen instead of the game
+
+# Arena settings
+LARGE_ARENA = False  # Play in a world larger than the screen, with a camera following the player
+ARENA_SIZE = (4000, 2400)  # World size in large-arena mode
+ARENA_ENEMY_GRID = (30, 76)  # Enemy rows and columns in large-arena mode
+CAMERA_CULL_MARGIN = 50  # Entities this far outside the view are still drawn and animated
+WORLD_WIDTH, WORLD_HEIGHT = ARENA_SIZE if LARGE_ARENA else (SCREEN_WIDTH, SCREEN_HEIGHT)
 
 # Colors (RGB values)
 BLACK = (0, 0, 0)
@@ -16,14 +26,13 @@ BLUE = (0, 0, 255)
 # Player settings
 PLAYER_SPEED = 5
 PLAYER_SIZE = (50, 40)
-PLAYER_START_X = SCREEN_WIDTH // 2
-PLAYER_START_Y = SCREEN_HEIGHT - 70
+PLAYER_START_X = WORLD_WIDTH // 2
+PLAYER_START_Y = WORLD_HEIGHT - 70
 
 # Enemy settings
 ENEMY_SPEED = 2
 ENEMY_SIZE = (40, 40)
-ENEMY_ROWS = 5
-ENEMY_COLS = 10
+ENEMY_ROWS, ENEMY_COLS = ARENA_ENEMY_GRID if LARGE_ARENA else (5, 10)
 ENEMY_SPACING = 10
 ENEMY_DROP_SPEED = 20
 
@@ -31,8 +40,49 @@ ENEMY_DROP_SPEED = 20
 BULLET_SPEED = 7
 BULLET_SIZE = (3, 15)
 BULLET_COLOR = WHITE
+PLAYER_TRAIL_LENGTH = 5  # Trail positions kept per player bullet
+ENEMY_TRAIL_LENGTH = 3  # Trail positions kept per enemy bullet
+TRAIL_ALPHA = 160  # Opacity of the newest trail afterimage
 
 # Game settings
 SCORE_PER_HIT = 10
 PLAYER_LIVES = 3
+RANDOM_SEED = None  # Set to an integer for reproducible enemy behaviour
+
+# Sound settings
+SOUND_VOLUME = 0.5  # Starting volume for music and effects
+SOUND_VOLUME_STEP = 0.1  # Volume change per +/- key press
+SOUND_CHANNEL_POOLS = {  # Mixer channels reserved per sound category, highest priority first
+    'game_over': 1,
+    'player_hit': 1,
+    'explosion': 3,
+    'shoot': 2,
+}
+SOUND_MAX_VOICES = 6  # Effects playing at once; new voices beyond this are dropped
 
+# Performance settings
+PIPELINED_RENDER = False  # Simulate the next tick on a worker thread while the current frame is drawn
+COMPACT_ENTITIES = False  # Slotted entities sharing their artwork and fixed-size trail buffers
+ADAPTIVE_QUALITY = True  # Drop optional visual effects when frames run over budget
+QUALITY_WINDOW = 30  # Frames averaged before the quality tier can change
+QUALITY_DEGRADE_RATIO = 1.0  # Lower quality when the average frame time exceeds this share of the budget
+QUALITY_RESTORE_RATIO = 0.6  # Raise quality when it falls below this share of the budget
+QUALITY_COOLDOWN = 60  # Minimum frames between tier changes
+VIDEO_CAPTURE = False  # Record every presented frame to CAPTURE_DIR
+CAPTURE_DIR = 'captures'
+CAPTURE_FORMAT = 'raw'  # 'raw' (one frames.raw stream) or 'png' (image sequence)
+CAPTURE_QUEUE_SIZE = 8  # Frames waiting for the writer before new ones are dropped
+CAPTURE_PNG_ENCODERS = 2  # Processes encoding PNGs in 'png' format
+RECORD_TRAJECTORIES = False  # Write (state, action, reward, done) records for imitation learning
+TRAJECTORY_DIR = 'trajectories'
+TRAJECTORY_SHARD_RECORDS = 65536  # Records per shard file
+TRAJECTORY_BUFFER_RECORDS = 256  # Records buffered in memory between writes
+TRAJECTORY_MAX_PLAYER_BULLETS = 8  # Bullets stored per record; extras furthest from the bottom are left out
+TRAJECTORY_MAX_ENEMY_BULLETS = 24
+SPECTATOR_SERVER = False  # Stream game state to spectators over TCP
+SPECTATOR_HOST = '127.0.0.1'
+SPECTATOR_PORT = 8765
+SPECTATOR_CLIENT_QUEUE = 120  # Messages queued per spectator before it is dropped as too slow
+LOW_LATENCY_INPUT = False  # Wait before reading input instead of after presenting, so input is read just in time
+LOW_LATENCY_MARGIN_MS = 2.0  # Safety margin added to the predicted frame work in low-latency mode
+INPUT_LATENCY_LOG = None  # CSV file for per-input latency from key arrival to the frame showing it
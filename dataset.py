@@ -0,0 +1,265 @@
+import os
+import time
+import mmap
+import glob
+import random
+import struct
+from collections import namedtuple
+from constants import *
+
+# Shard layout: a fixed header followed by fixed-size little-endian records.
+# The record count is derived from the file size, so a shard stays readable
+# even if the writer stopped in the middle of a session.
+SHARD_MAGIC = b'SITRAJ01'
+SHARD_HEADER = struct.Struct('<8sIIII')  # magic, record size, rows, cols, reserved
+HEADER_SIZE = 64
+
+OCCUPANCY_BYTES = (ENEMY_ROWS * ENEMY_COLS + 7) // 8
+
+# Action bits
+ACTION_LEFT = 1
+ACTION_RIGHT = 2
+ACTION_FIRE = 4
+
+# State observed before the tick's input was handled
+STATE = struct.Struct(
+    '<h'                                          # player x (center)
+    'hh'                                          # formation offset from its start
+    f'{OCCUPANCY_BYTES}s'                         # alive-enemy bitmap
+    'BB'                                          # player / enemy bullet counts
+    f'{2 * TRAJECTORY_MAX_PLAYER_BULLETS}h'       # player bullet (x, y) centers
+    f'{2 * TRAJECTORY_MAX_ENEMY_BULLETS}h'        # enemy bullet (x, y) centers
+    'IB'                                          # score, lives
+)
+# Action taken during the tick and its outcome
+OUTCOME = struct.Struct(
+    '<B'                                          # action bits
+    'f'                                           # reward
+    '?'                                           # done
+)
+RECORD = struct.Struct(STATE.format + OUTCOME.format[1:])
+
+Transition = namedtuple('Transition', [
+    'player_x', 'formation_offset', 'occupancy', 'player_bullets', 'enemy_bullets',
+    'score', 'lives', 'action', 'reward', 'done',
+])
+
+def bullet_positions(bullets, limit):
+    """Return how many bullet centers were kept (nearest the bottom first) and their flat (x, y) list"""
+    centers = sorted((bullet.rect.center for bullet in bullets), key=lambda c: c[1], reverse=True)[:limit]
+    flat = [0] * (2 * limit)
+    for i, (x, y) in enumerate(centers):
+        flat[2 * i] = x
+        flat[2 * i + 1] = y
+    return len(centers), flat
+
+def decode(buffer, offset=0):
+    """Decode one record from a buffer into a Transition"""
+    values = RECORD.unpack_from(buffer, offset)
+    player_x, offset_x, offset_y, occupancy, player_count, enemy_count = values[:6]
+    index = 6
+    player_flat = values[index:index + 2 * TRAJECTORY_MAX_PLAYER_BULLETS]
+    index += 2 * TRAJECTORY_MAX_PLAYER_BULLETS
+    enemy_flat = values[index:index + 2 * TRAJECTORY_MAX_ENEMY_BULLETS]
+    index += 2 * TRAJECTORY_MAX_ENEMY_BULLETS
+    score, lives, action, reward, done = values[index:]
+    return Transition(
+        player_x=player_x,
+        formation_offset=(offset_x, offset_y),
+        occupancy=int.from_bytes(occupancy, 'little'),
+        player_bullets=[(player_flat[2 * i], player_flat[2 * i + 1]) for i in range(player_count)],
+        enemy_bullets=[(enemy_flat[2 * i], enemy_flat[2 * i + 1]) for i in range(enemy_count)],
+        score=score,
+        lives=lives,
+        action=action,
+        reward=reward,
+        done=done,
+    )
+
+def encode_state(player, formation, player_bullets, enemy_bullets, score, lives):
+    """Pack the current game state into bytes for TrajectoryWriter.append"""
+    player_count, player_flat = bullet_positions(player_bullets, TRAJECTORY_MAX_PLAYER_BULLETS)
+    enemy_count, enemy_flat = bullet_positions(enemy_bullets, TRAJECTORY_MAX_ENEMY_BULLETS)
+    offset_x, offset_y = formation.offset()
+    return STATE.pack(
+        player.rect.centerx, offset_x, offset_y,
+        formation.occupancy().to_bytes(OCCUPANCY_BYTES, 'little'),
+        player_count, enemy_count, *player_flat, *enemy_flat,
+        score, lives)
+
+class TrajectoryWriter:
+    """Appends (state, action, reward, done) records to fixed-record shard files.
+    
+    Records are packed into an in-memory buffer and written out in large
+    chunks, so the game loop only pays for packing one record per tick.
+    """
+    def __init__(self, directory, shard_records=TRAJECTORY_SHARD_RECORDS,
+                 buffer_records=TRAJECTORY_BUFFER_RECORDS, session=None):
+        self.directory = directory
+        self.shard_records = shard_records
+        self.buffer_records = buffer_records
+        self.session = session if session is not None else f"{int(time.time())}_{os.getpid()}"
+        self.buffer = bytearray()
+        self.buffered = 0
+        self.shard_index = 0
+        self.shard_count = 0  # Records in the current shard, written or buffered
+        self.records_written = 0
+        self.file = None
+        os.makedirs(directory, exist_ok=True)
+    
+    def append(self, state, action, reward, done):
+        """Add one transition (state bytes from encode_state) to the write buffer"""
+        self.buffer += state
+        self.buffer += OUTCOME.pack(action, reward, done)
+        self.buffered += 1
+        self.shard_count += 1
+        if self.shard_count >= self.shard_records:
+            self.flush()
+            self.next_shard()
+        elif self.buffered >= self.buffer_records:
+            self.flush()
+    
+    def open_shard(self):
+        """Create the current shard file and write its header"""
+        path = os.path.join(self.directory, f"shard_{self.session}_{self.shard_index:05d}.bin")
+        self.file = open(path, 'wb')
+        header = SHARD_HEADER.pack(SHARD_MAGIC, RECORD.size, ENEMY_ROWS, ENEMY_COLS, 0)
+        self.file.write(header.ljust(HEADER_SIZE, b'\0'))
+    
+    def next_shard(self):
+        """Close the current shard so the next record starts a new one"""
+        if self.file:
+            self.file.close()
+            self.file = None
+        self.shard_index += 1
+        self.shard_count = 0
+    
+    def flush(self):
+        """Write buffered records to the current shard"""
+        if not self.buffered:
+            return
+        if self.file is None:
+            self.open_shard()
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.records_written += self.buffered
+        self.buffer.clear()
+        self.buffered = 0
+    
+    def close(self):
+        """Flush remaining records and close the shard"""
+        self.flush()
+        if self.file:
+            self.file.close()
+            self.file = None
+
+class TrajectoryShard:
+    """Read-only, memory-mapped view of one shard"""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            magic, record_size, rows, cols, _ = SHARD_HEADER.unpack_from(header)
+            if magic != SHARD_MAGIC or record_size != RECORD.size or (rows, cols) != (ENEMY_ROWS, ENEMY_COLS):
+                raise ValueError(f"{path} is not a compatible trajectory shard")
+            size = os.fstat(f.fileno()).st_size
+            self.count = (size - HEADER_SIZE) // record_size
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+        self.view = memoryview(self.map) if self.map else memoryview(b'')
+    
+    def __len__(self):
+        return self.count
+    
+    def raw(self, index):
+        """Return a zero-copy view of one record's bytes (valid until the shard is closed)"""
+        start = HEADER_SIZE + index * RECORD.size
+        return self.view[start:start + RECORD.size]
+    
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return decode(self.view, HEADER_SIZE + index * RECORD.size)
+    
+    def close(self):
+        """Release the memory map.
+        
+        If views from raw() are still held, the map can't be unmapped yet;
+        it is left for the garbage collector to free once they are gone.
+        """
+        try:
+            self.view.release()
+            if self.map:
+                self.map.close()
+        except BufferError:
+            pass
+        self.view = memoryview(b'')
+        self.map = None
+        self.count = 0
+
+class TrajectoryDataset:
+    """Streams or samples minibatches across many memory-mapped shards.
+    
+    Only the pages a batch touches are read from disk, so datasets larger
+    than RAM work fine.
+    """
+    def __init__(self, paths):
+        if isinstance(paths, str):
+            paths = sorted(glob.glob(os.path.join(paths, 'shard_*.bin')))
+        self.shards = [shard for shard in map(TrajectoryShard, paths) if len(shard)]
+        # Cumulative record counts for mapping a global index to a shard
+        self.ends = []
+        total = 0
+        for shard in self.shards:
+            total += len(shard)
+            self.ends.append(total)
+    
+    def __len__(self):
+        return self.ends[-1] if self.ends else 0
+    
+    def locate(self, index):
+        """Return (shard, local index) for a global record index"""
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        low, high = 0, len(self.ends) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self.ends[middle] > index:
+                high = middle
+            else:
+                low = middle + 1
+        start = self.ends[low - 1] if low else 0
+        return self.shards[low], index - start
+    
+    def __getitem__(self, index):
+        shard, local = self.locate(index)
+        return shard[local]
+    
+    def iter_batches(self, batch_size, decode_records=True):
+        """Yield consecutive minibatches over every shard in order.
+        
+        With ``decode_records=False`` the records are raw() views into the
+        shards' memory maps, valid until the dataset is closed.
+        """
+        batch = []
+        for shard in self.shards:
+            for i in range(len(shard)):
+                batch.append(shard[i] if decode_records else shard.raw(i))
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+    
+    def sample(self, batch_size, rng=None, decode_records=True):
+        """Return a minibatch of records drawn uniformly at random across all shards"""
+        rng = rng or random
+        batch = []
+        for index in (rng.randrange(len(self)) for _ in range(batch_size)):
+            shard, local = self.locate(index)
+            batch.append(shard[local] if decode_records else shard.raw(local))
+        return batch
+    
+    def close(self):
+        """Release every shard's memory map (see TrajectoryShard.close about held raw views)"""
+        for shard in self.shards:
+            shard.close()
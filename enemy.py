@@ -2,72 +2,113 @@ import pygame
 import random
 import math
 from constants import *
+import quality
+from rng import RandomStreams, SHOOT_STREAM, ANIMATION_STREAM, uniform_batch
+
+def draw_enemy_artwork(row):
+    """Draw the artwork for an enemy in the given row onto a new surface"""
+    image = pygame.Surface(ENEMY_SIZE, pygame.SRCALPHA)
+    width, height = ENEMY_SIZE
+    
+    # Different shapes and colors based on row
+    if row == 0:
+        # Top row: UFO-like enemies (red)
+        color = RED
+        # Draw oval-like UFO
+        pygame.draw.ellipse(image, color, (0, height//4, width, height//2))
+        # Draw cockpit
+        pygame.draw.ellipse(image, (200, 200, 255), (width//3, height//3, width//3, height//3))
+        # Draw lights
+        pygame.draw.circle(image, BLUE, (width//4, height//2), height//8)
+        pygame.draw.circle(image, GREEN, (3*width//4, height//2), height//8)
+    
+    elif row == 1 or row == 2:
+        # Middle rows: crab-like enemies (blue)
+        color = BLUE
+        # Draw body
+        pygame.draw.rect(image, color, (width//4, height//4, width//2, height//2))
+        # Draw eyes
+        pygame.draw.circle(image, WHITE, (width//3, height//3), height//8)
+        pygame.draw.circle(image, WHITE, (2*width//3, height//3), height//8)
+        pygame.draw.circle(image, BLACK, (width//3, height//3), height//16)
+        pygame.draw.circle(image, BLACK, (2*width//3, height//3), height//16)
+        # Draw claws
+        pygame.draw.rect(image, color, (0, height//2, width//5, height//4))
+        pygame.draw.rect(image, color, (4*width//5, height//2, width//5, height//4))
+    
+    else:
+        # Bottom rows: octopus-like enemies (green)
+        color = GREEN
+        # Draw head
+        pygame.draw.circle(image, color, (width//2, height//3), height//3)
+        # Draw eyes
+        pygame.draw.circle(image, WHITE, (width//3, height//3), height//10)
+        pygame.draw.circle(image, WHITE, (2*width//3, height//3), height//10)
+        pygame.draw.circle(image, BLACK, (width//3, height//3), height//20)
+        pygame.draw.circle(image, BLACK, (2*width//3, height//3), height//20)
+        # Draw tentacles
+        for i in range(4):
+            offset = i * (width//3)
+            pygame.draw.line(image, color, 
+                            (width//6 + offset, 2*height//3), 
+                            (width//6 + offset, height), 
+                            width//10)
+    
+    # Add white outline
+    if row == 0:
+        pygame.draw.ellipse(image, WHITE, (0, height//4, width, height//2), 1)
+    elif row == 1 or row == 2:
+        pygame.draw.rect(image, WHITE, (width//4, height//4, width//2, height//2), 1)
+    else:
+        pygame.draw.circle(image, WHITE, (width//2, height//3), height//3, 1)
+    
+    return image
+
+def enemy_kind(row):
+    """Return the artwork kind for a row (0 = UFO, 1 = crab, 2 = octopus)"""
+    if row == 0:
+        return 0
+    elif row == 1 or row == 2:
+        return 1
+    return 2
+
+# Shared, never-modified enemy images used by CompactEnemy,
+# keyed by (kind, size, flashing)
+_enemy_artwork_cache = {}
+
+def shared_enemy_image(kind, size=ENEMY_SIZE, flashing=False):
+    """Return a shared enemy image for an artwork kind, scaled and optionally flashing"""
+    key = (kind, size, flashing)
+    image = _enemy_artwork_cache.get(key)
+    if image is None:
+        if size == ENEMY_SIZE and not flashing:
+            # Any row of the right kind produces the same artwork
+            image = draw_enemy_artwork((0, 1, 3)[kind])
+        else:
+            image = pygame.transform.scale(shared_enemy_image(kind), size)
+            if flashing:
+                overlay = pygame.Surface(size, pygame.SRCALPHA)
+                overlay.fill((255, 255, 255, 100))  # Semi-transparent white
+                image.blit(overlay, (0, 0))
+        _enemy_artwork_cache[key] = image
+    return image
+
+def grid_position(row, col):
+    """Return the starting (x, y) position of a formation grid cell"""
+    x = 50 + col * (ENEMY_SIZE[0] + ENEMY_SPACING)
+    y = 50 + row * (ENEMY_SIZE[1] + ENEMY_SPACING)
+    return x, y
 
 class Enemy(pygame.sprite.Sprite):
-    def __init__(self, x, y, row, col):
+    def __init__(self, x, y, row, col, animation_timer=None):
         super().__init__()
         
-        # Create a surface for the enemy with transparency
-        self.image = pygame.Surface(ENEMY_SIZE, pygame.SRCALPHA)
-        self.original_image = pygame.Surface(ENEMY_SIZE, pygame.SRCALPHA)
-        
         # Different enemy types based on row
         self.row = row
         self.col = col
         
-        width, height = ENEMY_SIZE
-        
-        # Different shapes and colors based on row
-        if row == 0:
-            # Top row: UFO-like enemies (red)
-            color = RED
-            # Draw oval-like UFO
-            pygame.draw.ellipse(self.original_image, color, (0, height//4, width, height//2))
-            # Draw cockpit
-            pygame.draw.ellipse(self.original_image, (200, 200, 255), (width//3, height//3, width//3, height//3))
-            # Draw lights
-            pygame.draw.circle(self.original_image, BLUE, (width//4, height//2), height//8)
-            pygame.draw.circle(self.original_image, GREEN, (3*width//4, height//2), height//8)
-            
-        elif row == 1 or row == 2:
-            # Middle rows: crab-like enemies (blue)
-            color = BLUE
-            # Draw body
-            pygame.draw.rect(self.original_image, color, (width//4, height//4, width//2, height//2))
-            # Draw eyes
-            pygame.draw.circle(self.original_image, WHITE, (width//3, height//3), height//8)
-            pygame.draw.circle(self.original_image, WHITE, (2*width//3, height//3), height//8)
-            pygame.draw.circle(self.original_image, BLACK, (width//3, height//3), height//16)
-            pygame.draw.circle(self.original_image, BLACK, (2*width//3, height//3), height//16)
-            # Draw claws
-            pygame.draw.rect(self.original_image, color, (0, height//2, width//5, height//4))
-            pygame.draw.rect(self.original_image, color, (4*width//5, height//2, width//5, height//4))
-            
-        else:
-            # Bottom rows: octopus-like enemies (green)
-            color = GREEN
-            # Draw head
-            pygame.draw.circle(self.original_image, color, (width//2, height//3), height//3)
-            # Draw eyes
-            pygame.draw.circle(self.original_image, WHITE, (width//3, height//3), height//10)
-            pygame.draw.circle(self.original_image, WHITE, (2*width//3, height//3), height//10)
-            pygame.draw.circle(self.original_image, BLACK, (width//3, height//3), height//20)
-            pygame.draw.circle(self.original_image, BLACK, (2*width//3, height//3), height//20)
-            # Draw tentacles
-            for i in range(4):
-                offset = i * (width//3)
-                pygame.draw.line(self.original_image, color, 
-                                (width//6 + offset, 2*height//3), 
-                                (width//6 + offset, height), 
-                                width//10)
-        
-        # Add white outline
-        if row == 0:
-            pygame.draw.ellipse(self.original_image, WHITE, (0, height//4, width, height//2), 1)
-        elif row == 1 or row == 2:
-            pygame.draw.rect(self.original_image, WHITE, (width//4, height//4, width//2, height//2), 1)
-        else:
-            pygame.draw.circle(self.original_image, WHITE, (width//2, height//3), height//3, 1)
+        # Create the enemy artwork
+        self.original_image = self.load_artwork()
         
         # Copy the original image to the display image
         self.image = self.original_image.copy()
@@ -83,7 +124,9 @@ class Enemy(pygame.sprite.Sprite):
         # Direction is shared among all enemies and managed by EnemyFormation
         
         # Animation values
-        self.animation_timer = random.randint(0, 100)  # Randomize starting phase
+        if animation_timer is None:
+            animation_timer = random.randint(0, 100)  # Randomize starting phase
+        self.animation_timer = animation_timer
         self.pulse_amount = 0
         self.growing = True
         
@@ -91,57 +134,80 @@ class Enemy(pygame.sprite.Sprite):
         self.shoot_chance = 0.001  # 0.1% chance to shoot per frame
         self.preparing_to_shoot = False
         self.shoot_prep_timer = 0
+    
+    def load_artwork(self):
+        """Create this enemy's artwork surface"""
+        return draw_enemy_artwork(self.row)
+    
+    def update(self, direction, drop, visible=True):
+        """Update enemy position based on formation movement.
         
-    def update(self, direction, drop):
-        """Update enemy position based on formation movement"""
+        Off-screen enemies (``visible`` False) keep moving and counting down
+        their shot, but skip the pulse and flash rendering.
+        """
         if drop:
             self.rect.y += ENEMY_DROP_SPEED
         else:
             self.rect.x += ENEMY_SPEED * direction
-            
+        
         # Animation: pulse effect
         self.animation_timer += 1
         
         # Pulse the size every 30 frames
         if self.animation_timer % 30 == 0:
             self.growing = not self.growing
+        
+        # Handle shoot preparation visual
+        flashing = False
+        if self.preparing_to_shoot:
+            self.shoot_prep_timer += 1
+            # Flash the enemy white when about to shoot
+            flashing = self.shoot_prep_timer % 10 < 5
             
+            if self.shoot_prep_timer >= 30:
+                self.preparing_to_shoot = False
+                self.shoot_prep_timer = 0
+        
+        if not visible:
+            return
+        
         # Determine pulse amount (0 to 0.2)
         if self.growing:
             self.pulse_amount = 0.05 + 0.15 * math.sin(self.animation_timer * 0.1)
         else:
             self.pulse_amount = 0.05 + 0.15 * math.sin(self.animation_timer * 0.1 + math.pi)
-            
-        # Apply the pulse to create a subtle animation
-        pulse_factor = 1.0 + self.pulse_amount
-        width, height = ENEMY_SIZE
-        scaled_width = int(width * pulse_factor)
-        scaled_height = int(height * pulse_factor)
         
-        # Center the scaled image
-        x_offset = (scaled_width - width) // 2
-        y_offset = (scaled_height - height) // 2
+        # Apply the pulse to create a subtle animation (skipped at reduced quality)
+        if quality.settings.enemy_pulse:
+            pulse_factor = 1.0 + self.pulse_amount
+            width, height = ENEMY_SIZE
+            size = (int(width * pulse_factor), int(height * pulse_factor))
+        else:
+            size = ENEMY_SIZE
         
+        self.image = self.render_frame(size, flashing)
+    
+    def render_frame(self, size, flashing):
+        """Return the display image for a pulse size, with the white flash if requested"""
         # Reset the image and scale it
-        self.image = pygame.transform.scale(self.original_image, (scaled_width, scaled_height))
-        
-        # Handle shoot preparation visual
-        if self.preparing_to_shoot:
-            self.shoot_prep_timer += 1
-            # Flash the enemy white when about to shoot
-            if self.shoot_prep_timer % 10 < 5:
-                # Create a white overlay
-                overlay = pygame.Surface((self.image.get_width(), self.image.get_height()), pygame.SRCALPHA)
-                overlay.fill((255, 255, 255, 100))  # Semi-transparent white
-                self.image.blit(overlay, (0, 0))
-                
-            if self.shoot_prep_timer >= 30:
-                self.preparing_to_shoot = False
-                self.shoot_prep_timer = 0
+        if size == ENEMY_SIZE:
+            if not flashing:
+                return self.original_image
+            image = self.original_image.copy()
+        else:
+            image = pygame.transform.scale(self.original_image, size)
+        if flashing:
+            # Create a white overlay
+            overlay = pygame.Surface(size, pygame.SRCALPHA)
+            overlay.fill((255, 255, 255, 100))  # Semi-transparent white
+            image.blit(overlay, (0, 0))
+        return image
     
-    def can_shoot(self):
-        """Determine if this enemy will shoot on this frame"""
-        if not self.preparing_to_shoot and random.random() < self.shoot_chance:
+    def can_shoot(self, roll=None):
+        """Determine if this enemy will shoot on this frame, given a random roll in [0, 1)"""
+        if roll is None:
+            roll = random.random()
+        if not self.preparing_to_shoot and roll < self.shoot_chance:
             self.preparing_to_shoot = True
             self.shoot_prep_timer = 0
             return False  # Don't shoot immediately, wait for visual cue
@@ -150,33 +216,68 @@ class Enemy(pygame.sprite.Sprite):
         if self.preparing_to_shoot and self.shoot_prep_timer == 25:  # Shoot after 25 frames of preparation
             self.preparing_to_shoot = False
             return True
-            
+        
         return False
 
+class CompactEnemy(Enemy):
+    """Enemy with slotted attributes that shares its artwork and pulse frames.
+    
+    Every image this enemy displays comes from the shared cache and must not
+    be drawn into. (pygame.sprite.Sprite itself is not slotted, so a small
+    instance dict remains for its group bookkeeping.)
+    """
+    __slots__ = ('image', 'original_image', 'rect', 'row', 'col', 'kind',
+                 'animation_timer', 'pulse_amount', 'growing',
+                 'shoot_chance', 'preparing_to_shoot', 'shoot_prep_timer')
+    
+    def load_artwork(self):
+        """Use the shared artwork for this enemy's kind"""
+        self.kind = enemy_kind(self.row)
+        return shared_enemy_image(self.kind)
+    
+    def render_frame(self, size, flashing):
+        """Return the shared image for a pulse size"""
+        return shared_enemy_image(self.kind, size, flashing)
+
 class EnemyFormation:
-    def __init__(self):
+    def __init__(self, rng=None, enemy_class=None):
         self.enemies = pygame.sprite.Group()
         self.direction = 1  # 1 for right, -1 for left
         self.should_drop = False
         self.time_since_last_drop = 0
         
-        # Create the enemy formation
+        # Seeded random streams: one shooting stream per column, indexed by tick
+        self.rng = rng if rng is not None else RandomStreams()
+        self.shoot_streams = [self.rng.stream(SHOOT_STREAM, col) for col in range(ENEMY_COLS)]
+        self.tick = 0
+        
+        if enemy_class is None:
+            enemy_class = CompactEnemy if COMPACT_ENTITIES else Enemy
+        self.enemy_class = enemy_class
+        
+        # Create the enemy formation; grid[row][col] keeps each enemy (alive or not)
+        # so the enemies in a region can be found without scanning the group
+        self.grid = []
         self.create_formation()
     
     def create_formation(self):
         """Create a grid of enemies"""
         for row in range(ENEMY_ROWS):
+            self.grid.append([])
             for col in range(ENEMY_COLS):
                 # Calculate the position of each enemy in the grid
-                x = 50 + col * (ENEMY_SIZE[0] + ENEMY_SPACING)
-                y = 50 + row * (ENEMY_SIZE[1] + ENEMY_SPACING)
+                x, y = grid_position(row, col)
                 
                 # Create a new enemy and add it to the group
-                enemy = Enemy(x, y, row, col)
+                animation_timer = self.rng.randint(ANIMATION_STREAM, row * ENEMY_COLS + col, 0, 0, 100)
+                enemy = self.enemy_class(x, y, row, col, animation_timer)
                 self.enemies.add(enemy)
+                self.grid[row].append(enemy)
     
-    def update(self, current_time):
-        """Update the entire enemy formation"""
+    def update(self, current_time, view=None):
+        """Update the entire enemy formation, animating only enemies inside ``view`` if given"""
+        self.tick += 1
+        
         # Check if any enemy has reached the edge of the screen
         if self.should_change_direction():
             self.direction *= -1  # Reverse direction
@@ -185,13 +286,43 @@ class EnemyFormation:
             self.should_drop = False
         
         # Update all enemies with the new direction
-        for enemy in self.enemies:
-            enemy.update(self.direction, self.should_drop)
+        if view is None:
+            for enemy in self.enemies:
+                enemy.update(self.direction, self.should_drop)
+        else:
+            visible = set(self.visible_enemies(view))
+            for enemy in self.enemies:
+                enemy.update(self.direction, self.should_drop, enemy in visible)
+    
+    def visible_enemies(self, view):
+        """Return the alive enemies overlapping a world-space rect, in row-major order.
+        
+        The formation moves as one rigid grid, so only the grid cells under
+        ``view`` are looked at and the cost grows with the enemies in view.
+        """
+        if not self.enemies:
+            return []
+        dx, dy = self.offset()
+        origin_x, origin_y = grid_position(0, 0)
+        pitch_x = ENEMY_SIZE[0] + ENEMY_SPACING
+        pitch_y = ENEMY_SIZE[1] + ENEMY_SPACING
+        first_col = max(0, (view.left - origin_x - dx) // pitch_x - 1)
+        last_col = min(ENEMY_COLS - 1, (view.right - origin_x - dx) // pitch_x + 1)
+        first_row = max(0, (view.top - origin_y - dy) // pitch_y - 1)
+        last_row = min(ENEMY_ROWS - 1, (view.bottom - origin_y - dy) // pitch_y + 1)
+        visible = []
+        for row in range(first_row, last_row + 1):
+            cells = self.grid[row]
+            for col in range(first_col, last_col + 1):
+                enemy = cells[col]
+                if enemy.alive() and view.colliderect(enemy.rect):
+                    visible.append(enemy)
+        return visible
     
     def should_change_direction(self):
-        """Check if any enemy has reached the screen edge"""
+        """Check if any enemy has reached the world edge"""
         for enemy in self.enemies:
-            if (self.direction == 1 and enemy.rect.right >= SCREEN_WIDTH) or \
+            if (self.direction == 1 and enemy.rect.right >= WORLD_WIDTH) or \
                (self.direction == -1 and enemy.rect.left <= 0):
                 return True
         return False
@@ -209,13 +340,34 @@ class EnemyFormation:
             if enemy.col not in bottom_enemies or enemy.rect.y > bottom_enemies[enemy.col].rect.y:
                 bottom_enemies[enemy.col] = enemy
         
+        # Roll for every shooting column at once; each roll depends only on
+        # the column's stream and the tick, not on group iteration order
+        columns = sorted(bottom_enemies)
+        rolls = uniform_batch([self.shoot_streams[col] for col in columns], self.tick)
+        
         # Now check if any of the bottom enemies will shoot
-        for col, enemy in bottom_enemies.items():
-            if enemy.can_shoot():
+        for col, roll in zip(columns, rolls):
+            enemy = bottom_enemies[col]
+            if enemy.can_shoot(roll):
                 shooting_positions.append((enemy.rect.centerx, enemy.rect.bottom))
         
         return shooting_positions
     
+    def occupancy(self):
+        """Return a bitmask of alive enemies, with bit row * ENEMY_COLS + col set for each"""
+        mask = 0
+        for enemy in self.enemies:
+            mask |= 1 << (enemy.row * ENEMY_COLS + enemy.col)
+        return mask
+    
+    def offset(self):
+        """Return how far (dx, dy) the formation has moved from its starting position"""
+        # All enemies move together, so any one of them gives the offset
+        for enemy in self.enemies:
+            x, y = grid_position(enemy.row, enemy.col)
+            return enemy.rect.x - x, enemy.rect.y - y
+        return 0, 0
+    
     def any_enemies_left(self):
         """Check if there are any enemies left"""
         return len(self.enemies) > 0
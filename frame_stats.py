@@ -0,0 +1,62 @@
+import time
+from collections import deque
+
+def percentile(values, fraction):
+    """Return the value at the given fraction (0.0 - 1.0) of a sorted copy of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[index]
+
+class FrameStats:
+    """Rolling frame-time and input-latency measurements for the game loop"""
+    def __init__(self, window=600):
+        # Only keep the most recent samples so long sessions stay cheap
+        self.frame_times = deque(maxlen=window)
+        self.input_latencies = deque(maxlen=window)
+        self.frame_count = 0
+        self.frame_start = None
+
+    def begin_frame(self):
+        """Mark the start of a frame"""
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Mark the end of a frame and record how long it took (in ms)"""
+        if self.frame_start is None:
+            return 0.0
+        frame_time = (time.perf_counter() - self.frame_start) * 1000
+        self.frame_times.append(frame_time)
+        self.frame_count += 1
+        self.frame_start = None
+        return frame_time
+
+    def record_input_latency(self, input_time, presented_time=None):
+        """Record the delay (in ms) from an input event's arrival to presenting its result"""
+        if presented_time is None:
+            presented_time = time.perf_counter()
+        self.input_latencies.append((presented_time - input_time) * 1000)
+
+    def summary(self):
+        """Return a dictionary of the current frame-time and input-latency figures"""
+        frame_times = list(self.frame_times)
+        latencies = list(self.input_latencies)
+        return {
+            'frames': self.frame_count,
+            'frame_mean_ms': sum(frame_times) / len(frame_times) if frame_times else 0.0,
+            'frame_p95_ms': percentile(frame_times, 0.95),
+            'frame_max_ms': max(frame_times) if frame_times else 0.0,
+            'input_samples': len(latencies),
+            'input_mean_ms': sum(latencies) / len(latencies) if latencies else 0.0,
+            'input_p95_ms': percentile(latencies, 0.95),
+        }
+
+    def report(self, label):
+        """Format the summary as a single human readable line"""
+        s = self.summary()
+        return (f"[{label}] {s['frames']} frames: "
+                f"frame mean {s['frame_mean_ms']:.2f} ms, p95 {s['frame_p95_ms']:.2f} ms, "
+                f"max {s['frame_max_ms']:.2f} ms | "
+                f"input latency mean {s['input_mean_ms']:.2f} ms, "
+                f"p95 {s['input_p95_ms']:.2f} ms ({s['input_samples']} samples)")
@@ -0,0 +1,46 @@
+import pygame
+from constants import *
+
+class Framebuffer:
+    """Logical-resolution drawing surface presented to a window of any size.
+    
+    The game always draws at SCREEN_WIDTH x SCREEN_HEIGHT into ``surface``.
+    When the window is larger, ``present`` upscales the whole frame once
+    (letterboxed to keep the aspect ratio) instead of every sprite paying
+    for the bigger window.
+    """
+    def __init__(self, window_scale=WINDOW_SCALE, fullscreen=FULLSCREEN,
+                 use_scaled_display=USE_SCALED_DISPLAY):
+        logical_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        flags = pygame.FULLSCREEN if fullscreen else 0
+        self.target = None
+        
+        if use_scaled_display:
+            # Let SDL scale the logical surface to the window
+            self.window = pygame.display.set_mode(logical_size, flags | pygame.SCALED)
+            self.surface = self.window
+        elif fullscreen or window_scale != 1:
+            if fullscreen:
+                window_size = (0, 0)  # Use the desktop resolution
+            else:
+                window_size = (int(SCREEN_WIDTH * window_scale), int(SCREEN_HEIGHT * window_scale))
+            self.window = pygame.display.set_mode(window_size, flags)
+            self.surface = pygame.Surface(logical_size).convert()
+            
+            # Fit the frame inside the window, keeping the aspect ratio
+            window_width, window_height = self.window.get_size()
+            scale = min(window_width / SCREEN_WIDTH, window_height / SCREEN_HEIGHT)
+            viewport = pygame.Rect(0, 0, int(SCREEN_WIDTH * scale), int(SCREEN_HEIGHT * scale))
+            viewport.center = (window_width // 2, window_height // 2)
+            self.window.fill(BLACK)
+            self.target = self.window.subsurface(viewport)
+        else:
+            # Draw straight into the window
+            self.window = pygame.display.set_mode(logical_size, flags)
+            self.surface = self.window
+    
+    def present(self):
+        """Scale the frame to the window if needed and show it"""
+        if self.target is not None:
+            pygame.transform.scale(self.surface, self.target.get_size(), self.target)
+        pygame.display.flip()
@@ -0,0 +1,130 @@
+import csv
+import time
+from collections import deque
+import pygame
+from constants import *
+from frame_stats import percentile
+
+# Event types and keys the game reacts to; everything else is dropped
+GAME_EVENT_TYPES = [pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP]
+GAME_KEYS = {
+    pygame.K_ESCAPE, pygame.K_SPACE, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_r,
+    pygame.K_PLUS, pygame.K_EQUALS, pygame.K_MINUS, pygame.K_UNDERSCORE,
+}
+
+class InputQueue:
+    """Game input events, each stamped with the perf_counter time it was first seen.
+    
+    SDL is told to queue only the event types the game handles, and key
+    events for other keys are dropped on arrival. ``poll`` can be called
+    whenever the loop would otherwise sit idle, so the stamps stay close
+    to when the key was actually pressed.
+    """
+    def __init__(self):
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(GAME_EVENT_TYPES)
+        # Drop anything (window events etc.) queued before the filter was installed
+        pygame.event.clear()
+        self.events = []
+    
+    def poll(self):
+        """Move newly arrived events into the queue with their arrival time"""
+        arrived = pygame.event.get()
+        if arrived:
+            now = time.perf_counter()
+            for event in arrived:
+                if event.type == pygame.QUIT or (event.type in GAME_EVENT_TYPES and event.key in GAME_KEYS):
+                    self.events.append((now, event))
+    
+    def take(self):
+        """Return every queued (arrival time, event) pair, oldest first, and empty the queue"""
+        self.poll()
+        events = self.events
+        self.events = []
+        return events
+
+class FramePacer:
+    """Caps the frame rate while polling input, replacing clock.tick(FPS).
+    
+    Normally the loop waits after presenting a frame, like clock.tick.
+    In low-latency mode it waits before reading input instead. The next
+    frame is due one period after the last one was actually shown, and the
+    wait ends just early enough for the predicted work (the slowest recent
+    frame up to present(), plus a margin) to be done by then. Input is read
+    as late as possible. This pays off most when the flip waits for the
+    display: the wait moves from inside the flip, where input goes unread,
+    to before input is read.
+    """
+    def __init__(self, input_queue, fps=FPS, low_latency=LOW_LATENCY_INPUT,
+                 margin_ms=LOW_LATENCY_MARGIN_MS, window=60):
+        self.input_queue = input_queue
+        self.period = 1 / fps
+        self.low_latency = low_latency
+        self.margin = margin_ms / 1000
+        self.work_times = deque(maxlen=window)
+        self.next_due = time.perf_counter() + self.period
+        self.frame_start = None
+    
+    def wait_until(self, deadline):
+        """Sleep until deadline, polling input about once a millisecond"""
+        while True:
+            self.input_queue.poll()
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 0.001))
+    
+    def begin_frame(self):
+        """Call before reading input; in low-latency mode this is where the frame waits"""
+        if self.low_latency:
+            predicted = max(self.work_times, default=0.0) + self.margin
+            self.wait_until(self.next_due - predicted)
+        self.frame_start = time.perf_counter()
+    
+    def end_frame(self, present_start, presented_time):
+        """Call after presenting, with the perf_counter times present() was called and returned"""
+        self.work_times.append(present_start - self.frame_start)
+        if self.low_latency:
+            # A flip that waited for the display shows when frames really land
+            self.next_due = max(self.next_due, presented_time) + self.period
+        else:
+            self.wait_until(self.next_due)
+            # Don't try to catch up after a long stall
+            self.next_due = max(self.next_due + self.period, time.perf_counter())
+
+class InputLatencyLog:
+    """Per-event input-to-photon latency: from key arrival to the first frame showing its result"""
+    def __init__(self):
+        self.records = []
+    
+    def record(self, kind, arrival_time, handled_time, presented_time):
+        """Record one input given its perf_counter arrival, handling and presentation times"""
+        self.records.append((kind, arrival_time, handled_time, presented_time))
+    
+    def stats(self):
+        """Return mean and p95 latency (ms) and sample counts for each kind of input"""
+        latencies = {}
+        for kind, arrival, _, presented in self.records:
+            latencies.setdefault(kind, []).append((presented - arrival) * 1000)
+        return {kind: {'samples': len(values),
+                       'mean_ms': sum(values) / len(values),
+                       'p95_ms': percentile(values, 0.95)}
+                for kind, values in latencies.items()}
+    
+    def export(self, path):
+        """Write every recorded input to a CSV file"""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['kind', 'arrival_s', 'queued_ms', 'to_present_ms', 'latency_ms'])
+            for kind, arrival, handled, presented in self.records:
+                writer.writerow([kind, f"{arrival:.6f}", f"{(handled - arrival) * 1000:.3f}",
+                                 f"{(presented - handled) * 1000:.3f}", f"{(presented - arrival) * 1000:.3f}"])
+    
+    def report(self):
+        """Format the per-kind latency stats as a single human readable line"""
+        stats = self.stats()
+        if not stats:
+            return "[input] no inputs recorded"
+        parts = [f"{kind} mean {s['mean_ms']:.2f} ms, p95 {s['p95_ms']:.2f} ms ({s['samples']})"
+                 for kind, s in sorted(stats.items())]
+        return "[input] " + " | ".join(parts)
@@ -6,10 +6,23 @@ import random
 import wave
 import struct
 import math
+import time
 from constants import *
-from player import Player
-from projectile import Projectile
+from player import Player, CompactPlayer
+from projectile import Projectile, CompactProjectile, trail_blits
 from enemy import Enemy, EnemyFormation
+from rng import RandomStreams
+from frame_stats import FrameStats
+from input_events import InputQueue, FramePacer, InputLatencyLog
+from framebuffer import Framebuffer
+from camera import Camera
+import quality
+from quality import QualityGovernor
+from capture import FrameCapture
+from audio import AudioManager
+from dataset import TrajectoryWriter, encode_state, ACTION_LEFT, ACTION_RIGHT, ACTION_FIRE
+from spectator import SpectatorServer, StateTracker
+from render_pipeline import RenderSnapshot, SimulationWorker, sprite_entries
 
 def load_high_score():
     """Load high score from file, or return 0 if file doesn't exist"""
@@ -50,7 +63,7 @@ def create_simple_sound_file(filepath, duration=0.3, frequency=440):
     # Skip if file already exists
     if os.path.exists(filepath):
         return filepath
-        
+    
     try:
         # Sound parameters
         sample_rate = 44100
@@ -67,7 +80,7 @@ def create_simple_sound_file(filepath, duration=0.3, frequency=440):
             value = int(32767 * math.sin(2 * math.pi * frequency * i / sample_rate))
             data = struct.pack('<h', value)
             wave_file.writeframes(data)
-            
+        
         wave_file.close()
         return filepath
     except Exception as e:
@@ -93,39 +106,28 @@ def main():
     pygame.mixer.init()  # Initialize sound mixer
     
     # Create the game window
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    # The game draws into screen at the logical resolution; framebuffer.present()
+    # scales it to the window once per frame when the window is larger
+    framebuffer = Framebuffer()
+    screen = framebuffer.surface
     pygame.display.set_caption(SCREEN_TITLE)
     
-    # Set up the game clock
-    clock = pygame.time.Clock()
+    # Input events are stamped as they arrive; the pacer caps the frame rate
+    # (like clock.tick) and keeps polling input while it waits
+    input_queue = InputQueue()
+    frame_pacer = FramePacer(input_queue)
+    input_latency_log = InputLatencyLog()
     
     # Game state variables
     
-    # Load sound effects
-    try:
-        shoot_sound = pygame.mixer.Sound(shoot_sound_file) if shoot_sound_file else None
-        explosion_sound = pygame.mixer.Sound(explosion_sound_file) if explosion_sound_file else None
-        player_hit_sound = pygame.mixer.Sound(player_hit_sound_file) if player_hit_sound_file else None
-        game_over_sound = pygame.mixer.Sound(game_over_sound_file) if game_over_sound_file else None
-        
-        # Set default volumes
-        if shoot_sound: shoot_sound.set_volume(0.5)
-        if explosion_sound: explosion_sound.set_volume(0.5)
-        if player_hit_sound: player_hit_sound.set_volume(0.5)
-        if game_over_sound: game_over_sound.set_volume(0.5)
-        
+    # Sound effects go through one manager that pools channels and merges repeats
+    audio = AudioManager()
+    audio.load('shoot', shoot_sound_file)
+    audio.load('explosion', explosion_sound_file)
+    audio.load('player_hit', player_hit_sound_file)
+    audio.load('game_over', game_over_sound_file)
+    if audio.sounds:
         print("Sound effects loaded successfully")
-    except Exception as e:
-        # Fallback if the sound loading doesn't work
-        shoot_sound = None
-        explosion_sound = None
-        player_hit_sound = None
-        game_over_sound = None
-        print(f"Warning: Sound effects could not be loaded: {e}")
-    
-    # Set default volume
-    volume = 0.5
-    pygame.mixer.music.set_volume(volume)
     
     # Game state variables
     running = True
@@ -136,28 +138,37 @@ def main():
     game_started = False  # Track if the game has started
     game_over_time = 0  # Track when game over occurred for restart delay
     player_hit_time = 0  # Track when player was hit for flash effect
+    game_random = RandomStreams(RANDOM_SEED)  # Seeded random streams for this game
+    wave_number = 1  # Current enemy wave
+    # Entity classes (compact entities share artwork and use slots)
+    player_class = CompactPlayer if COMPACT_ENTITIES else Player
+    projectile_class = CompactProjectile if COMPACT_ENTITIES else Projectile
+    
     # Create sprite groups
     all_sprites = pygame.sprite.Group()
     player_bullets = pygame.sprite.Group()
     enemy_bullets = pygame.sprite.Group()
     
     # Create player
-    player = Player()
+    player = player_class()
     all_sprites.add(player)
     
     # Create enemy formation
-    enemy_formation = EnemyFormation()
+    enemy_formation = EnemyFormation(game_random.child(wave_number))
     for enemy in enemy_formation.enemies:
         all_sprites.add(enemy)
     # Main game loop
     # Function to reset the game
     def reset_game():
         nonlocal score, lives, game_over, game_started, player_hit_time, player, enemy_formation
+        nonlocal game_random, wave_number, observed_state
         score = 0
         lives = PLAYER_LIVES
         game_over = False
         game_started = True
         player_hit_time = 0
+        game_random = RandomStreams(RANDOM_SEED)
+        wave_number = 1
         
         # Clear all sprite groups
         all_sprites.empty()
@@ -165,68 +176,82 @@ def main():
         enemy_bullets.empty()
         
         # Create new player
-        player = Player()
+        player = player_class()
         all_sprites.add(player)
         
         # Create new enemy formation
-        enemy_formation = EnemyFormation()
+        enemy_formation = EnemyFormation(game_random.child(wave_number))
         for enemy in enemy_formation.enemies:
             all_sprites.add(enemy)
+        
+        # Input handled after the reset acts on the fresh game
+        if trajectory_writer:
+            observed_state = encode_state(player, enemy_formation, player_bullets, enemy_bullets, score, lives)
     
-    # Main game loop
-    while running:
-        current_time = pygame.time.get_ticks()
+    # (kind, arrival, handled) perf_counter stamps of gameplay inputs not yet consumed by a tick
+    pending_inputs = []
+    # Whether the player fired since the last tick (recorded as the tick's action)
+    player_fired = False
+    # State the player saw before this frame's input was handled (recorded as the tick's state)
+    observed_state = None
+    # In a large arena the screen shows the part of the world around the player
+    camera = Camera() if LARGE_ARENA else None
+    # Records (state, action, reward, done) for every tick played
+    trajectory_writer = TrajectoryWriter(TRAJECTORY_DIR) if RECORD_TRAJECTORIES else None
+    # Streams per-tick state deltas to spectators from a background asyncio thread
+    spectator_server = None
+    if SPECTATOR_SERVER:
+        try:
+            spectator_server = SpectatorServer()
+            spectator_server.start()
+            spectator_tracker = StateTracker()
+            print(f"Spectator server listening on {spectator_server.host}:{spectator_server.port}")
+        except OSError as e:
+            spectator_server = None
+            print(f"Warning: Spectator server could not be started: {e}")
+    
+    def take_snapshot(current_time, input_times=()):
+        """Capture the current game state as an immutable render snapshot"""
+        trails = trail_blits() if quality.settings.bullet_effects else ()
+        if camera:
+            # Keep only what is near the view, already moved to screen coordinates
+            camera.follow(player.rect)
+            sprites = camera.entries([player, *player_bullets, *enemy_bullets])
+            enemies = camera.entries(enemy_formation.visible_enemies(camera.cull))
+            trails = camera.blits(trails)
+            player_rect = camera.to_screen(player.rect)
+        else:
+            sprites = sprite_entries(all_sprites)
+            enemies = sprite_entries(enemy_formation.enemies)
+            player_rect = player.rect.copy()
+        return RenderSnapshot(
+            sprites=sprites,
+            enemies=enemies,
+            trails=trails,
+            player_rect=player_rect,
+            score=score,
+            high_score=high_score,
+            lives=lives,
+            game_started=game_started,
+            game_over=game_over,
+            game_over_time=game_over_time,
+            player_hit_time=player_hit_time,
+            current_time=current_time,
+            input_times=tuple(input_times),
+        )
+    
+    def simulate(current_time):
+        """Run one tick of game logic and return the resulting render snapshot"""
+        nonlocal score, high_score, lives, game_over, game_over_time, player_hit_time, enemy_formation, wave_number
+        nonlocal player_fired
+        input_times = pending_inputs[:]
+        del pending_inputs[:]
         
-        # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
-                elif event.key == pygame.K_SPACE and not game_started and not game_over:
-                    # Start the game when SPACE is pressed on start screen
-                    game_started = True
-                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS):
-                    # Increase volume
-                    volume = min(1.0, volume + 0.1)
-                    pygame.mixer.music.set_volume(volume)
-                    if shoot_sound:
-                        shoot_sound.set_volume(volume)
-                        explosion_sound.set_volume(volume)
-                        player_hit_sound.set_volume(volume)
-                        game_over_sound.set_volume(volume)
-                elif event.key in (pygame.K_MINUS, pygame.K_UNDERSCORE):
-                    # Decrease volume
-                    volume = max(0.0, volume - 0.1)
-                    pygame.mixer.music.set_volume(volume)
-                    if shoot_sound:
-                        shoot_sound.set_volume(volume)
-                        explosion_sound.set_volume(volume)
-                        player_hit_sound.set_volume(volume)
-                        game_over_sound.set_volume(volume)
-                elif game_started and not game_over:
-                    if event.key == pygame.K_LEFT:
-                        player.move_left()
-                    elif event.key == pygame.K_RIGHT:
-                        player.move_right()
-                    elif event.key == pygame.K_SPACE:
-                        bullet_pos = player.shoot()
-                        if bullet_pos:
-                            # Create new bullet and add it to sprite groups
-                            new_bullet = Projectile(bullet_pos[0], bullet_pos[1])
-                            player_bullets.add(new_bullet)
-                            all_sprites.add(new_bullet)
-                            # Play shooting sound
-                            if shoot_sound:
-                                shoot_sound.play()
-                elif game_over and event.key == pygame.K_r:
-                    # Reset the game if R is pressed on game over screen, after a delay
-                    if current_time - game_over_time > 1000:  # 1 second delay
-                        reset_game()
-            elif event.type == pygame.KEYUP and game_started and not game_over:
-                if event.key in (pygame.K_LEFT, pygame.K_RIGHT):
-                    player.stop()
+        # Record against the state taken before input, so a fired bullet isn't part of it
+        recording = trajectory_writer and game_started and not game_over
+        if recording:
+            state = observed_state
+            score_before = score
         
         # Game logic update (only if game has started and not game over)
         if game_started and not game_over:
@@ -236,12 +261,12 @@ def main():
             enemy_bullets.update()
             
             # Update enemy formation
-            enemy_formation.update(current_time)
+            enemy_formation.update(current_time, camera.cull if camera else None)
             
             # Check if any enemies should shoot
             enemy_shooting_positions = enemy_formation.check_enemies_shooting()
             for pos in enemy_shooting_positions:
-                new_bullet = Projectile(pos[0], pos[1], is_player_bullet=False)
+                new_bullet = projectile_class(pos[0], pos[1], is_player_bullet=False)
                 enemy_bullets.add(new_bullet)
                 all_sprites.add(new_bullet)
             
@@ -256,49 +281,63 @@ def main():
                 # Remove the enemy from all sprite groups
                 enemy.kill()
                 # Play explosion sound
-                if explosion_sound:
-                    explosion_sound.play()
+                audio.play('explosion')
             # Check for collisions between enemy bullets and player
             if pygame.sprite.spritecollide(player, enemy_bullets, True):
                 lives -= 1
                 # Set player hit time for flash effect
                 player_hit_time = current_time
                 # Play player hit sound
-                if player_hit_sound:
-                    player_hit_sound.play()
+                audio.play('player_hit')
                 
                 if lives <= 0:
                     game_over = True
                     game_over_time = current_time
                     # Play game over sound
-                    if game_over_sound:
-                        game_over_sound.play()
-            # Check for collisions between enemies and player
+                    audio.play('game_over')
             # Check for collisions between enemies and player
             if pygame.sprite.spritecollide(player, enemy_formation.enemies, False):
                 lives = 0
                 game_over = True
                 game_over_time = current_time
                 # Play game over sound
-                if game_over_sound:
-                    game_over_sound.play()
+                audio.play('game_over')
             # Check if enemies have reached the bottom
             if enemy_formation.get_lowest_enemy_position() >= player.rect.top:
                 game_over = True
                 game_over_time = current_time
                 # Play game over sound
-                if game_over_sound:
-                    game_over_sound.play()
+                audio.play('game_over')
             # Check if all enemies are destroyed
             if not enemy_formation.any_enemies_left():
                 # Create new wave of enemies
-                enemy_formation = EnemyFormation()
+                wave_number += 1
+                enemy_formation = EnemyFormation(game_random.child(wave_number))
                 for enemy in enemy_formation.enemies:
                     all_sprites.add(enemy)
-        # Drawing
+        
+        if recording:
+            action = ACTION_FIRE if player_fired else 0
+            if player.direction_x < 0:
+                action |= ACTION_LEFT
+            elif player.direction_x > 0:
+                action |= ACTION_RIGHT
+            trajectory_writer.append(state, action, score - score_before, game_over)
+        player_fired = False
+        
+        # Only track deltas while someone is watching; new spectators get a keyframe
+        if spectator_server and spectator_server.clients:
+            delta = spectator_tracker.update(player, enemy_formation, player_bullets, enemy_bullets, score, lives)
+            keyframe = spectator_tracker.keyframe() if spectator_server.keyframe_wanted else None
+            spectator_server.publish(delta, keyframe)
+        
+        return take_snapshot(current_time, input_times)
+    
+    def draw_frame(snapshot):
+        """Draw a render snapshot to the screen"""
         screen.fill(BLACK)
         
-        if not game_started:
+        if not snapshot.game_started:
             # Draw start screen
             # Title
             title_text = "SPACE INVADERS"
@@ -318,7 +357,7 @@ def main():
                 draw_text(screen, line, 36, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + i * 40, align="center")
             
             # Display high score
-            draw_text(screen, f"High Score: {high_score}", 48, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, 
+            draw_text(screen, f"High Score: {snapshot.high_score}", 48, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, 
                       color=(255, 215, 0), align="center")  # Gold color for high score
             
             # Draw some enemy examples
@@ -329,27 +368,31 @@ def main():
             enemy_example2 = Enemy(3 * SCREEN_WIDTH // 4, SCREEN_HEIGHT // 4 + 50, 2, 0)
             enemy_example2.update(0, False)
             screen.blit(enemy_example2.image, enemy_example2.rect)
-            
+        
         else:
-            # Draw all game objects
-            all_sprites.draw(screen)
-            enemy_formation.enemies.draw(screen)
+            # Draw all game objects, with bullet trails behind them in one batch
+            screen.blits(snapshot.trails, doreturn=False)
+            screen.blits(snapshot.sprites, doreturn=False)
+            screen.blits(snapshot.enemies, doreturn=False)
             
             # Apply flash effect if player was recently hit
-            if player_hit_time > 0 and current_time - player_hit_time < 500:  # Flash for 500ms
-                if (current_time - player_hit_time) % 100 < 50:  # Alternate flash every 50ms
+            frame_time = snapshot.current_time
+            hit_time = snapshot.player_hit_time
+            if quality.settings.flash_effects and hit_time > 0 and frame_time - hit_time < 500:  # Flash for 500ms
+                if (frame_time - hit_time) % 100 < 50:  # Alternate flash every 50ms
                     # Create a red flash overlay on the player
-                    flash_surface = pygame.Surface((player.rect.width, player.rect.height), pygame.SRCALPHA)
+                    player_rect = snapshot.player_rect
+                    flash_surface = pygame.Surface((player_rect.width, player_rect.height), pygame.SRCALPHA)
                     flash_surface.fill((255, 0, 0, 128))  # Semi-transparent red
-                    screen.blit(flash_surface, player.rect)
+                    screen.blit(flash_surface, player_rect)
             
             # Display score, high score and lives
-            draw_text(screen, f"Score: {score}", 36, 10, 10)
-            draw_text(screen, f"High Score: {high_score}", 36, SCREEN_WIDTH // 2, 10, align="center")
-            draw_text(screen, f"Lives: {lives}", 36, SCREEN_WIDTH - 150, 10)
+            draw_text(screen, f"Score: {snapshot.score}", 36, 10, 10)
+            draw_text(screen, f"High Score: {snapshot.high_score}", 36, SCREEN_WIDTH // 2, 10, align="center")
+            draw_text(screen, f"Lives: {snapshot.lives}", 36, SCREEN_WIDTH - 150, 10)
             
             # Display game over screen if necessary
-            if game_over:
+            if snapshot.game_over:
                 # Semi-transparent overlay
                 overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
                 overlay.set_alpha(180)
@@ -361,21 +404,135 @@ def main():
                          color=RED, align="center")
                 
                 # Final score, high score and restart instructions
-                draw_text(screen, f"Final Score: {score}", 36, SCREEN_WIDTH//2, SCREEN_HEIGHT//2, 
+                draw_text(screen, f"Final Score: {snapshot.score}", 36, SCREEN_WIDTH//2, SCREEN_HEIGHT//2, 
                          align="center")
-                draw_text(screen, f"High Score: {high_score}", 36, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50, 
+                draw_text(screen, f"High Score: {snapshot.high_score}", 36, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50, 
                          color=(255, 215, 0), align="center")
                 
                 # Only show restart prompt after a delay
-                if current_time - game_over_time > 1000:  # 1 second delay
+                if frame_time - snapshot.game_over_time > 1000:  # 1 second delay
                     draw_text(screen, "Press R to restart", 36, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 100, 
                              align="center")
+    
+    # Frame-time and input-latency measurements
+    frame_stats = FrameStats()
+    # Lowers visual quality when frames run over budget, and restores it
+    quality_governor = QualityGovernor() if ADAPTIVE_QUALITY else None
+    # Records presented frames on a background thread, dropping frames rather than stalling
+    frame_capture = FrameCapture(CAPTURE_DIR, CAPTURE_FORMAT, CAPTURE_QUEUE_SIZE, CAPTURE_PNG_ENCODERS) if VIDEO_CAPTURE else None
+    
+    # In pipelined mode the next tick is simulated on a worker thread while the
+    # current snapshot is drawn; all pygame display and event calls stay here.
+    simulation_worker = SimulationWorker(simulate) if PIPELINED_RENDER else None
+    front_snapshot = take_snapshot(pygame.time.get_ticks())
+    
+    # Main game loop
+    while running:
+        # In low-latency mode this waits, so input below is read just in time
+        frame_pacer.begin_frame()
+        frame_stats.begin_frame()
+        current_time = pygame.time.get_ticks()
+        
+        # Snapshot what the player is reacting to before input (e.g. a new bullet) changes it
+        if trajectory_writer and not game_over:
+            observed_state = encode_state(player, enemy_formation, player_bullets, enemy_bullets, score, lives)
+        
+        # Event handling
+        for arrival_time, event in input_queue.take():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE and not game_started and not game_over:
+                    # Start the game when SPACE is pressed on start screen
+                    game_started = True
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS):
+                    # Increase volume
+                    audio.change_volume(SOUND_VOLUME_STEP)
+                elif event.key in (pygame.K_MINUS, pygame.K_UNDERSCORE):
+                    # Decrease volume
+                    audio.change_volume(-SOUND_VOLUME_STEP)
+                elif game_started and not game_over:
+                    if event.key == pygame.K_LEFT:
+                        player.move_left()
+                        pending_inputs.append(('move', arrival_time, time.perf_counter()))
+                    elif event.key == pygame.K_RIGHT:
+                        player.move_right()
+                        pending_inputs.append(('move', arrival_time, time.perf_counter()))
+                    elif event.key == pygame.K_SPACE:
+                        bullet_pos = player.shoot()
+                        if bullet_pos:
+                            # Create new bullet and add it to sprite groups
+                            new_bullet = projectile_class(bullet_pos[0], bullet_pos[1])
+                            player_bullets.add(new_bullet)
+                            all_sprites.add(new_bullet)
+                            pending_inputs.append(('shoot', arrival_time, time.perf_counter()))
+                            player_fired = True
+                            # Play shooting sound
+                            audio.play('shoot')
+                elif game_over and event.key == pygame.K_r:
+                    # Reset the game if R is pressed on game over screen, after a delay
+                    if current_time - game_over_time > 1000:  # 1 second delay
+                        reset_game()
+            elif event.type == pygame.KEYUP and game_started and not game_over:
+                if event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                    player.stop()
+                    pending_inputs.append(('stop', arrival_time, time.perf_counter()))
+        
+        if simulation_worker:
+            # Simulate the next tick while the previous snapshot is drawn
+            simulation_worker.submit(current_time)
+            draw_frame(front_snapshot)
+            present_start = time.perf_counter()
+            framebuffer.present()
+            presented_time = time.perf_counter()
+            if frame_capture:
+                frame_capture.capture_frame(screen)
+            presented = front_snapshot
+            front_snapshot = simulation_worker.collect()
+        else:
+            front_snapshot = simulate(current_time)
+            draw_frame(front_snapshot)
+            present_start = time.perf_counter()
+            framebuffer.present()
+            presented_time = time.perf_counter()
+            if frame_capture:
+                frame_capture.capture_frame(screen)
+            presented = front_snapshot
         
-        # Update the display
-        pygame.display.flip()
+        # Record latency, from arrival, for inputs whose result is now on screen
+        for kind, arrival_time, handled_time in presented.input_times:
+            frame_stats.record_input_latency(arrival_time, presented_time)
+            input_latency_log.record(kind, arrival_time, handled_time, presented_time)
         
-        # Cap the frame rate
-        clock.tick(FPS)
+        # Play sounds triggered this frame (simulation and input), merging repeats
+        audio.flush()
+        
+        frame_work_ms = frame_stats.end_frame()
+        if quality_governor:
+            quality_governor.record_frame(frame_work_ms)
+        
+        # Cap the frame rate (in low-latency mode the wait happens before input instead)
+        frame_pacer.end_frame(present_start, presented_time)
+    
+    if simulation_worker:
+        simulation_worker.stop()
+    print(frame_stats.report("pipelined" if PIPELINED_RENDER else "serial"))
+    print(input_latency_log.report())
+    if INPUT_LATENCY_LOG:
+        input_latency_log.export(INPUT_LATENCY_LOG)
+    if quality_governor:
+        print(quality_governor.report())
+    print(audio.report())
+    if trajectory_writer:
+        trajectory_writer.close()
+    if spectator_server:
+        spectator_server.stop()
+        print(spectator_server.report())
+    if frame_capture:
+        frame_capture.close()
+        print(frame_capture.report())
     
     # Clean up
     pygame.quit()
@@ -0,0 +1,118 @@
+"""Memory footprint report for standard and compact entities.
+
+Run with ``python memory_report.py``. Python heap figures come from
+tracemalloc; pixel buffers are allocated by SDL outside the Python heap, so
+they are counted separately from the surfaces each entity references
+(shared surfaces are counted once).
+"""
+import os
+import gc
+import tracemalloc
+
+# Surfaces and transforms work without a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from constants import *
+from player import Player, CompactPlayer
+from projectile import Projectile, CompactProjectile
+from enemy import Enemy, CompactEnemy, EnemyFormation
+from rng import RandomStreams
+
+REPORT_SEED = 1234
+ENTITY_COUNT = 2000
+SESSION_WAVES = 10
+TICKS_PER_WAVE = 600
+
+def surface_bytes(sprites):
+    """Return the pixel bytes of every distinct surface referenced by the sprites"""
+    seen = {}
+    for sprite in sprites:
+        for name in ('image', 'original_image'):
+            surface = getattr(sprite, name, None)
+            if surface is not None:
+                seen[id(surface)] = surface
+    return sum(s.get_width() * s.get_height() * s.get_bytesize() for s in seen.values())
+
+def measure_entities(create, update, count=ENTITY_COUNT, updates=10):
+    """Return (python bytes, pixel bytes) per entity for ``count`` entities"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [create(i) for i in range(count)]
+    for _ in range(updates):
+        for entity in entities:
+            update(entity)
+    python_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    pixel_bytes = surface_bytes(entities)
+    # The measured bullets never joined a group, so kill them to free their trail slots
+    for entity in entities:
+        entity.kill()
+    return python_bytes / count, pixel_bytes / count
+
+def run_session(compact, waves=SESSION_WAVES):
+    """Play a scripted headless session and return (peak python bytes, peak pixel bytes)"""
+    enemy_class = CompactEnemy if compact else Enemy
+    projectile_class = CompactProjectile if compact else Projectile
+    game_random = RandomStreams(REPORT_SEED)
+    
+    gc.collect()
+    tracemalloc.start()
+    peak_pixels = 0
+    
+    player = (CompactPlayer if compact else Player)()
+    player_bullets = pygame.sprite.Group()
+    enemy_bullets = pygame.sprite.Group()
+    for wave in range(1, waves + 1):
+        formation = EnemyFormation(game_random.child(wave), enemy_class)
+        for tick in range(TICKS_PER_WAVE):
+            if not formation.any_enemies_left():
+                break
+            # Keep a steady stream of player bullets sweeping across the formation
+            if tick % 4 == 0:
+                x = 25 + (tick * 37) % (SCREEN_WIDTH - 50)
+                player_bullets.add(projectile_class(x, player.rect.top))
+            player.update()
+            player_bullets.update()
+            enemy_bullets.update()
+            formation.update(tick)
+            for x, y in formation.check_enemies_shooting():
+                enemy_bullets.add(projectile_class(x, y, is_player_bullet=False))
+            pygame.sprite.groupcollide(formation.enemies, player_bullets, True, True)
+            
+            if tick % 30 == 0:
+                live = [player, *formation.enemies, *player_bullets, *enemy_bullets]
+                peak_pixels = max(peak_pixels, surface_bytes(live))
+        formation.enemies.empty()
+    
+    peak_python = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak_python, peak_pixels
+
+def main():
+    pygame.init()
+    rng = RandomStreams(REPORT_SEED)
+    rows = []
+    for label, enemy_class, projectile_class in (
+            ("standard", Enemy, Projectile),
+            ("compact", CompactEnemy, CompactProjectile)):
+        enemy_python, enemy_pixels = measure_entities(
+            lambda i: enemy_class(0, 0, i % ENEMY_ROWS, i % ENEMY_COLS, rng.randint(0, i, 0, 0, 100)),
+            lambda enemy: enemy.update(0, False))
+        bullet_python, bullet_pixels = measure_entities(
+            lambda i: projectile_class(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, i % 2 == 0),
+            lambda bullet: bullet.update())
+        session_python, session_pixels = run_session(label == "compact")
+        rows.append((label, enemy_python, enemy_pixels, bullet_python, bullet_pixels,
+                     session_python, session_pixels))
+    
+    print(f"{'mode':<10}{'enemy heap':>12}{'enemy px':>10}{'bullet heap':>13}{'bullet px':>11}"
+          f"{'10-wave peak heap':>19}{'peak px':>10}")
+    for label, ep, ex, bp, bx, sp, sx in rows:
+        print(f"{label:<10}{ep:>10.0f} B{ex:>8.0f} B{bp:>11.0f} B{bx:>9.0f} B"
+              f"{sp / 1024:>16.1f} KB{sx / 1024:>7.1f} KB")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
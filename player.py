@@ -1,33 +1,49 @@
 import pygame
 from constants import *
 
+def draw_player_artwork():
+    """Draw the player ship onto a new surface"""
+    # Create a surface for the player ship with transparency
+    image = pygame.Surface(PLAYER_SIZE, pygame.SRCALPHA)
+    
+    # Draw a triangular spaceship using polygon
+    width, height = PLAYER_SIZE
+    
+    # Define the points for the triangle (spaceship)
+    points = [
+        (width // 2, 0),  # Top center
+        (0, height),      # Bottom left
+        (width, height)   # Bottom right
+    ]
+    
+    # Draw the ship body (green triangle)
+    pygame.draw.polygon(image, GREEN, points)
+    
+    # Add some details to the ship
+    pygame.draw.polygon(image, WHITE, points, 2)  # White outline
+    
+    # Add an engine glow at the bottom
+    pygame.draw.rect(image, BLUE, 
+                     (width // 3, height - 8, width // 3, 8))
+    return image
+
+# Shared player artwork used by CompactPlayer
+_player_artwork = None
+
+def shared_player_image():
+    """Return the shared, never-modified player ship image"""
+    global _player_artwork
+    if _player_artwork is None:
+        _player_artwork = draw_player_artwork()
+    return _player_artwork
+
 class Player(pygame.sprite.Sprite):
     def __init__(self):
         super().__init__()
         
         # Create a simple rectangle for the player ship
-        # Create a surface for the player ship with transparency
-        self.image = pygame.Surface(PLAYER_SIZE, pygame.SRCALPHA)
-        
-        # Draw a triangular spaceship using polygon
-        width, height = PLAYER_SIZE
-        
-        # Define the points for the triangle (spaceship)
-        points = [
-            (width // 2, 0),  # Top center
-            (0, height),      # Bottom left
-            (width, height)   # Bottom right
-        ]
-        
-        # Draw the ship body (green triangle)
-        pygame.draw.polygon(self.image, GREEN, points)
+        self.image = self.load_artwork()
         
-        # Add some details to the ship
-        pygame.draw.polygon(self.image, WHITE, points, 2)  # White outline
-        
-        # Add an engine glow at the bottom
-        pygame.draw.rect(self.image, BLUE, 
-                         (width // 3, height - 8, width // 3, 8))
         # Get the rectangle for positioning
         self.rect = self.image.get_rect()
         
@@ -45,16 +61,20 @@ class Player(pygame.sprite.Sprite):
         self.last_shot_time = 0
         self.shoot_cooldown = 500  # milliseconds
     
+    def load_artwork(self):
+        """Create the player ship surface"""
+        return draw_player_artwork()
+    
     def update(self):
         """Update the player's position based on movement direction"""
         # Move the player horizontally
         self.rect.x += self.direction_x * self.speed
         
-        # Keep the player within the screen boundaries
+        # Keep the player within the world boundaries
         if self.rect.left < 0:
             self.rect.left = 0
-        elif self.rect.right > SCREEN_WIDTH:
-            self.rect.right = SCREEN_WIDTH
+        elif self.rect.right > WORLD_WIDTH:
+            self.rect.right = WORLD_WIDTH
     
     def move_left(self):
         """Set direction to move left"""
@@ -85,3 +105,10 @@ class Player(pygame.sprite.Sprite):
             return (bullet_x, bullet_y)
         return None
 
+class CompactPlayer(Player):
+    """Player with slotted attributes that shares its ship artwork"""
+    __slots__ = ('image', 'rect', 'speed', 'direction_x', 'last_shot_time', 'shoot_cooldown')
+    
+    def load_artwork(self):
+        """Use the shared ship artwork"""
+        return shared_player_image()
@@ -2,52 +2,125 @@ import pygame
 import random
 import math
 from constants import *
+import quality
+from trails import TrailBuffer
+
+def draw_bullet_artwork(is_player_bullet):
+    """Draw the artwork for a player or enemy bullet onto a new surface"""
+    image = pygame.Surface(BULLET_SIZE, pygame.SRCALPHA)
+    
+    # Different visuals for player vs enemy projectiles
+    width, height = BULLET_SIZE
+    
+    if is_player_bullet:
+        # Player bullet: laser beam style
+        # Main beam (bright center)
+        pygame.draw.rect(image, (100, 255, 100), (width//3, 0, width//3, height))
+        
+        # Glow effect around the beam
+        pygame.draw.rect(image, (200, 255, 200, 150), (0, 0, width, height))
+        
+        # Create a gradient effect (brighter at the top)
+        for i in range(5):
+            alpha = 150 - i * 30
+            y_pos = i * height // 5
+            glow_height = height // 5
+            glow_surface = pygame.Surface((width, glow_height), pygame.SRCALPHA)
+            glow_surface.fill((255, 255, 255, alpha))
+            image.blit(glow_surface, (0, y_pos))
+    
+    else:
+        # Enemy bullet: plasma ball style
+        # Core of the plasma
+        pygame.draw.circle(image, (255, 100, 100), (width//2, height//2), width//2)
+        
+        # Outer glow
+        for radius in range(width//2, 0, -1):
+            alpha = 150 - radius * 20
+            if alpha > 0:
+                pygame.draw.circle(image, (255, 200, 100, alpha),
+                                  (width//2, height//2), radius)
+    
+    return image
+
+def scale_player_bullet(image, scaled_width):
+    """Return a player bullet image squeezed to scaled_width, centered at full width"""
+    width, height = BULLET_SIZE
+    temp_image = pygame.transform.scale(image, (scaled_width, height))
+    # Create a new image to blit the scaled image centered
+    scaled = pygame.Surface(BULLET_SIZE, pygame.SRCALPHA)
+    x_offset = (width - scaled_width) // 2
+    scaled.blit(temp_image, (x_offset, 0))
+    return scaled
+
+# Shared, never-modified bullet images used by CompactProjectile
+_bullet_artwork_cache = {}
+
+def shared_bullet_image(key, is_player_bullet):
+    """Return a shared bullet image.
+    
+    ``key`` is 'artwork' for the base artwork, 'flash' for the solid image
+    shown before the first update, or a scaled width for player bullet frames.
+    """
+    cache_key = (key, is_player_bullet)
+    image = _bullet_artwork_cache.get(cache_key)
+    if image is None:
+        if key == 'artwork':
+            image = draw_bullet_artwork(is_player_bullet)
+        elif key == 'flash':
+            image = pygame.Surface(BULLET_SIZE, pygame.SRCALPHA)
+            image.fill(BULLET_COLOR)
+        else:
+            image = scale_player_bullet(shared_bullet_image('artwork', is_player_bullet), key)
+        _bullet_artwork_cache[cache_key] = image
+    return image
+
+# One shared set of ring buffers holding the trail history of every live bullet
+bullet_trails = TrailBuffer(max(PLAYER_TRAIL_LENGTH, ENEMY_TRAIL_LENGTH))
+
+# Trail kinds used as indexes into the afterimage table
+PLAYER_TRAIL = 0
+ENEMY_TRAIL = 1
+
+_trail_afterimages = None
+
+def trail_afterimages():
+    """Return the fading afterimages for each trail kind, newest first"""
+    global _trail_afterimages
+    if _trail_afterimages is None:
+        _trail_afterimages = []
+        for is_player_bullet, length in ((True, PLAYER_TRAIL_LENGTH), (False, ENEMY_TRAIL_LENGTH)):
+            artwork = shared_bullet_image('artwork', is_player_bullet)
+            half_width, half_height = artwork.get_width() // 2, artwork.get_height() // 2
+            images = []
+            for age in range(length):
+                # Fade out linearly with age
+                alpha = TRAIL_ALPHA * (length - age) // (length + 1)
+                image = artwork.copy()
+                image.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+                images.append((image, half_width, half_height))
+            _trail_afterimages.append(images)
+    return _trail_afterimages
+
+def trail_blits():
+    """Return (image, position) pairs for every live bullet trail, ready for Surface.blits"""
+    return bullet_trails.blit_list(trail_afterimages())
 
 class Projectile(pygame.sprite.Sprite):
     def __init__(self, x, y, is_player_bullet=True):
         super().__init__()
-        # Create the bullet surface with transparency
-        self.image = pygame.Surface(BULLET_SIZE, pygame.SRCALPHA)
-        self.original_image = pygame.Surface(BULLET_SIZE, pygame.SRCALPHA)
-        
         # Store if this is a player bullet
         self.is_player_bullet = is_player_bullet
         
         # Animation timer and properties
         self.animation_timer = 0
-        self.trail_positions = []  # Store previous positions for trail effect
         
-        # Different visuals for player vs enemy projectiles
-        width, height = BULLET_SIZE
+        # Store previous positions for trail effect (only last few positions)
+        self.max_trail_length = PLAYER_TRAIL_LENGTH if is_player_bullet else ENEMY_TRAIL_LENGTH
+        self.init_trail()
         
-        if is_player_bullet:
-            # Player bullet: laser beam style
-            # Main beam (bright center)
-            pygame.draw.rect(self.original_image, (100, 255, 100), (width//3, 0, width//3, height))
-            
-            # Glow effect around the beam
-            pygame.draw.rect(self.original_image, (200, 255, 200, 150), (0, 0, width, height))
-            
-            # Create a gradient effect (brighter at the top)
-            for i in range(5):
-                alpha = 150 - i * 30
-                y_pos = i * height // 5
-                glow_height = height // 5
-                glow_surface = pygame.Surface((width, glow_height), pygame.SRCALPHA)
-                glow_surface.fill((255, 255, 255, alpha))
-                self.original_image.blit(glow_surface, (0, y_pos))
-                
-        else:
-            # Enemy bullet: plasma ball style
-            # Core of the plasma
-            pygame.draw.circle(self.original_image, (255, 100, 100), (width//2, height//2), width//2)
-            
-            # Outer glow
-            for radius in range(width//2, 0, -1):
-                alpha = 150 - radius * 20
-                if alpha > 0:
-                    pygame.draw.circle(self.original_image, (255, 200, 100, alpha), 
-                                      (width//2, height//2), radius)
+        # Create the bullet artwork
+        self.original_image = self.load_artwork()
         
         # Copy to the display image
         self.image = self.original_image.copy()
@@ -61,17 +134,49 @@ class Projectile(pygame.sprite.Sprite):
         self.rect.bottom = y if is_player_bullet else y + 5
         # Set bullet speed (negative for upward movement, positive for downward)
         self.speed = -BULLET_SPEED if is_player_bullet else BULLET_SPEED
-        
-        # Store previous positions for trail effect (only last few positions)
-        self.max_trail_length = 5 if is_player_bullet else 3
-        self.is_player_bullet = is_player_bullet
+    
+    def load_artwork(self):
+        """Create this bullet's artwork surface"""
+        return draw_bullet_artwork(self.is_player_bullet)
+    
+    def init_trail(self):
+        """Reserve a ring buffer slot in the shared trail storage"""
+        kind = PLAYER_TRAIL if self.is_player_bullet else ENEMY_TRAIL
+        self.trail_slot = bullet_trails.acquire(kind, self.max_trail_length)
+    
+    def record_trail(self):
+        """Store the current position for the trail effect"""
+        if self.trail_slot is not None:
+            bullet_trails.record(self.trail_slot, self.rect.centerx, self.rect.centery)
+    
+    def get_trail(self):
+        """Return the stored trail positions, oldest first"""
+        if self.trail_slot is None:
+            return []
+        return bullet_trails.get(self.trail_slot)
+    
+    def release_trail(self):
+        """Give the trail slot back, at most once (the slot may be reused by a new bullet)"""
+        if self.trail_slot is not None:
+            bullet_trails.release(self.trail_slot)
+            self.trail_slot = None
+    
+    def remove_internal(self, group):
+        """Free the trail slot once Group.remove or Group.empty takes the bullet out of its last group"""
+        super().remove_internal(group)
+        if not self.alive():
+            self.release_trail()
+    
+    def kill(self):
+        """Remove the bullet from every group and free its trail slot"""
+        # Sprite.kill() doesn't go through remove_internal, so release here too
+        super().kill()
+        self.release_trail()
     
     def update(self):
         """Update the bullet's position and animation"""
         # Store current position for trail effect before moving
-        if len(self.trail_positions) >= self.max_trail_length:
-            self.trail_positions.pop(0)  # Remove oldest position
-        self.trail_positions.append((self.rect.centerx, self.rect.centery))
+        self.record_trail()
         
         # Move the bullet vertically
         self.rect.y += self.speed
@@ -79,23 +184,25 @@ class Projectile(pygame.sprite.Sprite):
         # Animate the bullet
         self.animation_timer += 1
         
-        if self.is_player_bullet:
+        if not quality.settings.bullet_effects:
+            # Reduced quality: plain artwork, no pulse, overlay or rotation
+            if self.image is not self.original_image:
+                self.image = self.original_image
+                self.rect = self.image.get_rect(center=self.rect.center)
+        elif self.is_player_bullet:
             # Player bullet: Trailing effect
             self.update_player_bullet_visuals()
         else:
             # Enemy bullet: Pulsing effect
             self.update_enemy_bullet_visuals()
         
-        # Remove the bullet if it goes off screen
+        # Remove the bullet if it leaves the world
         if (self.is_player_bullet and self.rect.bottom < 0) or \
-           (not self.is_player_bullet and self.rect.top > SCREEN_HEIGHT):
+           (not self.is_player_bullet and self.rect.top > WORLD_HEIGHT):
             self.kill()  # Remove this bullet from all sprite groups
     
     def update_player_bullet_visuals(self):
         """Update the visual appearance of player bullets"""
-        # Reset the image
-        self.image = self.original_image.copy()
-        
         # Add slight pulsing glow effect
         pulse = math.sin(self.animation_timer * 0.2) * 0.2 + 0.8  # 0.6 to 1.0 range
         
@@ -103,13 +210,17 @@ class Projectile(pygame.sprite.Sprite):
         width, height = BULLET_SIZE
         scaled_width = max(int(width * pulse), 1)
         
+        self.image = self.player_bullet_frame(scaled_width)
+    
+    def player_bullet_frame(self, scaled_width):
+        """Return the player bullet image for a pulse width"""
+        # Reset the image
+        image = self.original_image.copy()
+        
         # Ensure we maintain the height but vary the width slightly
-        if scaled_width != width:
-            temp_image = pygame.transform.scale(self.image, (scaled_width, height))
-            # Create a new image to blit the scaled image centered
-            self.image = pygame.Surface(BULLET_SIZE, pygame.SRCALPHA)
-            x_offset = (width - scaled_width) // 2
-            self.image.blit(temp_image, (x_offset, 0))
+        if scaled_width != BULLET_SIZE[0]:
+            image = scale_player_bullet(image, scaled_width)
+        return image
     
     def update_enemy_bullet_visuals(self):
         """Update the visual appearance of enemy bullets"""
@@ -136,3 +247,26 @@ class Projectile(pygame.sprite.Sprite):
         new_rect = self.image.get_rect(center=self.rect.center)
         self.rect = new_rect
 
+class CompactProjectile(Projectile):
+    """Projectile with slotted attributes and shared artwork.
+    
+    Images taken from the shared cache must not be drawn into; enemy bullets
+    still build their rotated frame per instance from a copy.
+    """
+    __slots__ = ('image', 'original_image', 'rect', 'is_player_bullet',
+                 'animation_timer', 'speed', 'max_trail_length', 'trail_slot')
+    
+    def __init__(self, x, y, is_player_bullet=True):
+        super().__init__(x, y, is_player_bullet)
+        # Start with the shared solid image rather than a private filled copy
+        self.image = shared_bullet_image('flash', is_player_bullet)
+    
+    def load_artwork(self):
+        """Use the shared artwork for this bullet type"""
+        return shared_bullet_image('artwork', self.is_player_bullet)
+    
+    def player_bullet_frame(self, scaled_width):
+        """Return the shared player bullet image for a pulse width"""
+        if scaled_width == BULLET_SIZE[0]:
+            return self.original_image
+        return shared_bullet_image(scaled_width, True)
@@ -0,0 +1,95 @@
+from collections import deque
+from constants import *
+
+# Quality tiers, from full quality to cheapest. Each tier also keeps every
+# reduction of the tiers before it.
+QUALITY_TIERS = [
+    "full",
+    "no enemy pulse",
+    "no bullet effects",
+    "no flash overlays",
+]
+
+class QualitySettings:
+    """Which optional visual effects are currently enabled"""
+    def __init__(self):
+        self.tier = 0
+        self.enemy_pulse = True      # Enemy pulse scaling in Enemy.update
+        self.bullet_effects = True   # Bullet pulse, rotation and color overlays
+        self.flash_effects = True    # Hit flash overlay on the player
+    
+    def set_tier(self, tier):
+        """Enable or disable effects for a quality tier"""
+        self.tier = tier
+        self.enemy_pulse = tier < 1
+        self.bullet_effects = tier < 2
+        self.flash_effects = tier < 3
+
+# Shared settings read by entities and the draw code every frame
+settings = QualitySettings()
+
+class QualityGovernor:
+    """Moves between quality tiers based on measured frame time.
+    
+    Quality drops one tier when the average frame time over the window
+    exceeds the budget, and comes back one tier when it falls well below.
+    After any change the governor waits ``cooldown`` frames before moving
+    again, so it doesn't oscillate around the threshold.
+    """
+    def __init__(self, budget_ms=1000 / FPS, window=QUALITY_WINDOW,
+                 degrade_ratio=QUALITY_DEGRADE_RATIO, restore_ratio=QUALITY_RESTORE_RATIO,
+                 cooldown=QUALITY_COOLDOWN, quality=settings):
+        self.budget_ms = budget_ms
+        self.frame_times = deque(maxlen=window)
+        self.degrade_ms = budget_ms * degrade_ratio
+        self.restore_ms = budget_ms * restore_ratio
+        self.cooldown = cooldown
+        self.frames_since_change = 0
+        self.tier_changes = 0
+        self.quality = quality
+        self.last_frame_ms = 0.0
+    
+    def record_frame(self, frame_ms):
+        """Record one frame's work time (ms) and adjust the quality tier if needed"""
+        self.last_frame_ms = frame_ms
+        self.frame_times.append(frame_ms)
+        self.frames_since_change += 1
+        if self.frames_since_change < self.cooldown or len(self.frame_times) < self.frame_times.maxlen:
+            return
+        
+        average = self.average_frame_ms()
+        tier = self.quality.tier
+        if average > self.degrade_ms and tier < len(QUALITY_TIERS) - 1:
+            self.change_tier(tier + 1)
+        elif average < self.restore_ms and tier > 0:
+            self.change_tier(tier - 1)
+    
+    def change_tier(self, tier):
+        """Switch to a new tier and restart the measurement window"""
+        self.quality.set_tier(tier)
+        self.frame_times.clear()
+        self.frames_since_change = 0
+        self.tier_changes += 1
+    
+    def average_frame_ms(self):
+        """Return the average frame time over the current window"""
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
+    
+    def stats(self):
+        """Return the current tier and frame times for monitoring"""
+        return {
+            'tier': self.quality.tier,
+            'tier_name': QUALITY_TIERS[self.quality.tier],
+            'tier_changes': self.tier_changes,
+            'budget_ms': self.budget_ms,
+            'last_frame_ms': self.last_frame_ms,
+            'average_frame_ms': self.average_frame_ms(),
+        }
+    
+    def report(self):
+        """Format the current stats as a single human readable line"""
+        s = self.stats()
+        return (f"[quality] tier {s['tier']} ({s['tier_name']}), {s['tier_changes']} changes, "
+                f"frame avg {s['average_frame_ms']:.2f} ms / budget {s['budget_ms']:.2f} ms")
@@ -0,0 +1,78 @@
+import threading
+from collections import namedtuple
+
+# Immutable view of everything the draw code needs for one frame.
+# Sprite entries are (image, rect) pairs with copied rects, so the simulation
+# can keep moving the live sprites while this snapshot is being drawn.
+RenderSnapshot = namedtuple('RenderSnapshot', [
+    'sprites',          # (image, rect) pairs from all_sprites, in draw order
+    'enemies',          # (image, rect) pairs from the enemy formation
+    'trails',           # (image, position) pairs for every bullet trail afterimage
+    'player_rect',      # copy of the player's rect (for the hit flash)
+    'score',
+    'high_score',
+    'lives',
+    'game_started',
+    'game_over',
+    'game_over_time',
+    'player_hit_time',
+    'current_time',     # game time (ms) the snapshot was taken at
+    'input_times',      # (kind, arrival, handled) perf_counter stamps of inputs consumed by this tick
+])
+
+def sprite_entries(group):
+    """Capture (image, rect) pairs for every sprite in a group"""
+    # Sprites replace their image each frame instead of drawing into it,
+    # so holding a reference to the current image is enough.
+    return tuple((sprite.image, sprite.rect.copy()) for sprite in group)
+
+class SimulationWorker:
+    """Runs one simulation tick on a background thread while the main thread renders.
+
+    The worker owns the back buffer: ``submit`` starts producing the next
+    snapshot and ``collect`` waits for it, after which it becomes the front
+    buffer the main thread draws. Only one tick is ever in flight, so game
+    state is never touched by both threads at the same time.
+    """
+    def __init__(self, step):
+        self.step = step
+        self.pending_time = None
+        self.result = None
+        self.error = None
+        self.running = True
+        self.work_ready = threading.Event()
+        self.work_done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            self.work_ready.wait()
+            self.work_ready.clear()
+            if not self.running:
+                return
+            try:
+                self.result = self.step(self.pending_time)
+            except Exception as e:
+                self.error = e
+            self.work_done.set()
+
+    def submit(self, current_time):
+        """Start simulating the next tick in the background"""
+        self.pending_time = current_time
+        self.work_done.clear()
+        self.work_ready.set()
+
+    def collect(self):
+        """Wait for the tick started by submit() and return its snapshot"""
+        self.work_done.wait()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        return self.result
+
+    def stop(self):
+        """Shut down the worker thread"""
+        self.running = False
+        self.work_ready.set()
+        self.thread.join(timeout=1.0)
@@ -0,0 +1,73 @@
+import random
+
+# Counter-based random numbers: every value is a pure function of
+# (stream key, counter), so results never depend on call order and are
+# bit-identical across processes and platforms.
+
+MASK64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+FLOAT_SCALE = 1.0 / (1 << 53)
+
+# Stream purposes
+SHOOT_STREAM = 1
+ANIMATION_STREAM = 2
+
+def mix64(z):
+    """SplitMix64 finalizer: scramble a 64-bit integer"""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+def derive_key(seed, *parts):
+    """Derive an independent stream key from a seed and any number of integers"""
+    key = mix64(seed & MASK64)
+    for part in parts:
+        key = mix64(((key ^ (part & MASK64)) + GOLDEN_GAMMA) & MASK64)
+    return key
+
+def random_bits(key, counter):
+    """Return the 64-bit value at position ``counter`` of the stream ``key``"""
+    return mix64((key + (counter + 1) * GOLDEN_GAMMA) & MASK64)
+
+def uniform(key, counter):
+    """Return a float in [0, 1) for position ``counter`` of the stream ``key``"""
+    return (random_bits(key, counter) >> 11) * FLOAT_SCALE
+
+def uniform_batch(keys, counter):
+    """Draw one float in [0, 1) from each stream in ``keys`` at the same counter.
+
+    Keys may come from different games, so a single call can roll for a
+    whole formation or a batch of formations at once.
+    """
+    step = ((counter + 1) * GOLDEN_GAMMA) & MASK64
+    values = []
+    for key in keys:
+        z = (key + step) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        values.append(((z ^ (z >> 31)) >> 11) * FLOAT_SCALE)
+    return values
+
+class RandomStreams:
+    """Seeded family of counter-based random streams for one game"""
+    def __init__(self, seed=None):
+        # Without a seed, pick one so each game still plays differently
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed & MASK64
+
+    def child(self, *parts):
+        """Return an independent family of streams (e.g. for one enemy wave)"""
+        return RandomStreams(derive_key(self.seed, *parts))
+
+    def stream(self, purpose, index=0):
+        """Return the key of the stream for a purpose (e.g. SHOOT_STREAM) and index (e.g. column)"""
+        return derive_key(self.seed, purpose, index)
+
+    def uniform(self, purpose, index, counter):
+        """Return a float in [0, 1) from one stream"""
+        return uniform(self.stream(purpose, index), counter)
+
+    def randint(self, purpose, index, counter, a, b):
+        """Return an integer in [a, b] from one stream"""
+        return a + random_bits(self.stream(purpose, index), counter) % (b - a + 1)
@@ -0,0 +1,441 @@
+"""Live spectating over TCP: an asyncio server that runs beside the game loop,
+and a headless client that rebuilds and renders the game from the stream.
+
+Run ``python spectator.py [host] [port]`` to watch a game started with
+SPECTATOR_SERVER enabled.
+
+Wire format: every message is a little-endian u32 payload length followed by
+the payload. A payload starts with its type byte.
+
+KEYFRAME: tick u32, player x i16, formation offset i16 i16, alive-enemy
+          bitmap, score u32, lives u8, bullet count u16, then per bullet
+          id u32, kind u8 (0 = player, 1 = enemy), center x i16, y i16
+DELTA:    tick u32, flags u8, then only the fields whose flag is set, in
+          flag order. The enemy field is the XOR of the old and new bitmaps;
+          spawned bullets use the keyframe bullet layout and killed bullets
+          are a u16 count of u32 ids.
+
+Bullets move in a straight line at a fixed speed, so clients advance them
+locally each tick instead of receiving positions every frame.
+"""
+import os
+import sys
+import time
+import struct
+import asyncio
+import threading
+import pygame
+from constants import *
+from enemy import grid_position, enemy_kind, shared_enemy_image
+from player import shared_player_image
+from projectile import shared_bullet_image
+
+KEYFRAME = 1
+DELTA = 2
+
+# Delta flags
+FLAG_PLAYER = 1
+FLAG_OFFSET = 2
+FLAG_ENEMIES = 4
+FLAG_SCORE = 8
+FLAG_LIVES = 16
+FLAG_SPAWN = 32
+FLAG_KILL = 64
+
+PLAYER_BULLET = 0
+ENEMY_BULLET = 1
+
+OCCUPANCY_BYTES = (ENEMY_ROWS * ENEMY_COLS + 7) // 8
+
+LENGTH = struct.Struct('<I')
+MESSAGE_HEADER = struct.Struct('<BI')  # type, tick
+KEYFRAME_STATE = struct.Struct(f'<hhh{OCCUPANCY_BYTES}sIBH')
+DELTA_FLAGS = struct.Struct('<B')
+BULLET = struct.Struct('<IBhh')
+BULLET_ID = struct.Struct('<I')
+COUNT = struct.Struct('<H')
+PLAYER_X = struct.Struct('<h')
+OFFSET = struct.Struct('<hh')
+OCCUPANCY = struct.Struct(f'<{OCCUPANCY_BYTES}s')
+SCORE = struct.Struct('<I')
+LIVES = struct.Struct('<B')
+
+def frame(payload):
+    """Prefix a payload with its length"""
+    return LENGTH.pack(len(payload)) + payload
+
+class StateTracker:
+    """Turns the live game state into keyframes and per-tick deltas (game thread)"""
+    def __init__(self):
+        self.tick = 0
+        self.player_x = 0
+        self.offset = (0, 0)
+        self.occupancy = 0
+        self.score = 0
+        self.lives = 0
+        self.bullet_ids = {}  # Live bullet sprite -> id
+        self.bullet_kinds = {}
+        self.next_bullet_id = 1
+    
+    def update(self, player, formation, player_bullets, enemy_bullets, score, lives):
+        """Advance one tick and return the encoded delta message"""
+        self.tick += 1
+        flags = 0
+        parts = []
+        
+        if player.rect.centerx != self.player_x:
+            self.player_x = player.rect.centerx
+            flags |= FLAG_PLAYER
+            parts.append(PLAYER_X.pack(self.player_x))
+        offset = formation.offset()
+        if offset != self.offset:
+            self.offset = offset
+            flags |= FLAG_OFFSET
+            parts.append(OFFSET.pack(*offset))
+        occupancy = formation.occupancy()
+        if occupancy != self.occupancy:
+            changed = occupancy ^ self.occupancy
+            self.occupancy = occupancy
+            flags |= FLAG_ENEMIES
+            parts.append(OCCUPANCY.pack(changed.to_bytes(OCCUPANCY_BYTES, 'little')))
+        if score != self.score:
+            self.score = score
+            flags |= FLAG_SCORE
+            parts.append(SCORE.pack(score))
+        if lives != self.lives:
+            self.lives = lives
+            flags |= FLAG_LIVES
+            parts.append(LIVES.pack(lives))
+        
+        # Spawned and killed bullets
+        spawned = []
+        live = set()
+        for group, kind in ((player_bullets, PLAYER_BULLET), (enemy_bullets, ENEMY_BULLET)):
+            for bullet in group:
+                live.add(bullet)
+                if bullet not in self.bullet_ids:
+                    bullet_id = self.next_bullet_id
+                    self.next_bullet_id += 1
+                    self.bullet_ids[bullet] = bullet_id
+                    self.bullet_kinds[bullet] = kind
+                    spawned.append(BULLET.pack(bullet_id, kind, *bullet.rect.center))
+        killed = [bullet for bullet in self.bullet_ids if bullet not in live]
+        if spawned:
+            flags |= FLAG_SPAWN
+            parts.append(COUNT.pack(len(spawned)))
+            parts.extend(spawned)
+        if killed:
+            flags |= FLAG_KILL
+            parts.append(COUNT.pack(len(killed)))
+            for bullet in killed:
+                parts.append(BULLET_ID.pack(self.bullet_ids.pop(bullet)))
+                del self.bullet_kinds[bullet]
+        
+        return frame(MESSAGE_HEADER.pack(DELTA, self.tick) + DELTA_FLAGS.pack(flags) + b''.join(parts))
+    
+    def keyframe(self):
+        """Return the full state as of the last update"""
+        parts = [
+            MESSAGE_HEADER.pack(KEYFRAME, self.tick),
+            KEYFRAME_STATE.pack(self.player_x, self.offset[0], self.offset[1],
+                                self.occupancy.to_bytes(OCCUPANCY_BYTES, 'little'),
+                                self.score, self.lives, len(self.bullet_ids)),
+        ]
+        for bullet, bullet_id in self.bullet_ids.items():
+            parts.append(BULLET.pack(bullet_id, self.bullet_kinds[bullet], *bullet.rect.center))
+        return frame(b''.join(parts))
+
+class SpectatorConnection:
+    """One connected spectator and its bounded outgoing queue"""
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.synced = False  # Set once the client has received a keyframe
+
+class SpectatorServer:
+    """Asyncio TCP server on a background thread that fans game deltas out to spectators.
+    
+    The game thread only calls ``publish``, which hands the encoded messages
+    to the event loop and returns immediately. Each client has its own
+    bounded queue; a client that falls so far behind that its queue fills
+    up is disconnected instead of slowing anyone else down.
+    """
+    def __init__(self, host=SPECTATOR_HOST, port=SPECTATOR_PORT, client_queue_size=SPECTATOR_CLIENT_QUEUE):
+        self.host = host
+        self.port = port
+        self.client_queue_size = client_queue_size
+        self.loop = asyncio.new_event_loop()
+        self.clients = set()
+        self.handlers = set()  # Tasks serving each connection
+        self.keyframe_wanted = False
+        self.server = None
+        self.error = None
+        self.started = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="spectator-server", daemon=True)
+        
+        # Statistics
+        self.clients_served = 0
+        self.clients_dropped = 0
+        self.messages_sent = 0
+        self.bytes_sent = 0
+    
+    def start(self):
+        """Start listening; raises if the server could not bind"""
+        self.thread.start()
+        self.started.wait()
+        if self.error:
+            raise self.error
+    
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle_client, self.host, self.port))
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as e:
+            self.error = e
+            self.started.set()
+            return
+        self.started.set()
+        self.loop.run_forever()
+        self.loop.close()
+    
+    async def _handle_client(self, reader, writer):
+        client = SpectatorConnection(writer, self.client_queue_size)
+        self.handlers.add(asyncio.current_task())
+        self.clients.add(client)
+        self.clients_served += 1
+        self.keyframe_wanted = True
+        try:
+            while True:
+                message = await client.queue.get()
+                if message is None:
+                    break
+                writer.write(message)
+                await writer.drain()
+                self.messages_sent += 1
+                self.bytes_sent += len(message)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.clients.discard(client)
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+    
+    def publish(self, delta, keyframe=None):
+        """Queue a tick's delta (and a keyframe for new clients) for broadcast; never blocks"""
+        if self.clients:
+            self.loop.call_soon_threadsafe(self._broadcast, delta, keyframe)
+    
+    def _broadcast(self, delta, keyframe):
+        waiting = False
+        for client in list(self.clients):
+            if client.synced:
+                message = delta
+            elif keyframe is not None:
+                message = keyframe
+                client.synced = True
+            else:
+                waiting = True
+                continue
+            try:
+                client.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too slow to keep up: drop it rather than buffer without bound
+                self.clients.discard(client)
+                self.clients_dropped += 1
+                client.writer.transport.abort()
+        self.keyframe_wanted = waiting
+    
+    async def _shutdown(self):
+        self.server.close()
+        for client in list(self.clients):
+            # Replace anything still queued with the stop signal
+            while not client.queue.empty():
+                client.queue.get_nowait()
+            client.queue.put_nowait(None)
+            client.writer.transport.abort()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+    
+    def stop(self):
+        """Disconnect every client and stop the server thread"""
+        if self.server is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+        try:
+            future.result(timeout=1.0)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=1.0)
+    
+    def stats(self):
+        """Return client and traffic counters"""
+        return {
+            'clients': len(self.clients),
+            'clients_served': self.clients_served,
+            'clients_dropped': self.clients_dropped,
+            'messages_sent': self.messages_sent,
+            'bytes_sent': self.bytes_sent,
+        }
+    
+    def report(self):
+        """Format the server stats as a single human readable line"""
+        s = self.stats()
+        return (f"[spectator] {s['clients_served']} clients served, {s['clients_dropped']} dropped, "
+                f"{s['messages_sent']} messages, {s['bytes_sent']} bytes sent")
+
+class SpectatorState:
+    """Game state rebuilt from keyframes and deltas on the client side"""
+    def __init__(self):
+        self.synced = False
+        self.tick = 0
+        self.player_x = PLAYER_START_X
+        self.offset = (0, 0)
+        self.occupancy = 0
+        self.score = 0
+        self.lives = 0
+        self.bullets = {}  # id -> [kind, x, y]
+    
+    def apply(self, payload):
+        """Apply one message payload"""
+        message_type, tick = MESSAGE_HEADER.unpack_from(payload)
+        offset = MESSAGE_HEADER.size
+        if message_type == KEYFRAME:
+            player_x, offset_x, offset_y, occupancy, self.score, self.lives, count = \
+                KEYFRAME_STATE.unpack_from(payload, offset)
+            offset += KEYFRAME_STATE.size
+            self.player_x = player_x
+            self.offset = (offset_x, offset_y)
+            self.occupancy = int.from_bytes(occupancy, 'little')
+            self.bullets = {}
+            offset = self._read_bullets(payload, offset, count)
+            self.tick = tick
+            self.synced = True
+            return
+        if message_type != DELTA or not self.synced:
+            return
+        
+        # Bullets fly straight, so move them for the ticks that have passed
+        self._advance_bullets(tick - self.tick)
+        self.tick = tick
+        
+        flags, = DELTA_FLAGS.unpack_from(payload, offset)
+        offset += DELTA_FLAGS.size
+        if flags & FLAG_PLAYER:
+            self.player_x, = PLAYER_X.unpack_from(payload, offset)
+            offset += PLAYER_X.size
+        if flags & FLAG_OFFSET:
+            self.offset = OFFSET.unpack_from(payload, offset)
+            offset += OFFSET.size
+        if flags & FLAG_ENEMIES:
+            changed, = OCCUPANCY.unpack_from(payload, offset)
+            self.occupancy ^= int.from_bytes(changed, 'little')
+            offset += OCCUPANCY.size
+        if flags & FLAG_SCORE:
+            self.score, = SCORE.unpack_from(payload, offset)
+            offset += SCORE.size
+        if flags & FLAG_LIVES:
+            self.lives, = LIVES.unpack_from(payload, offset)
+            offset += LIVES.size
+        if flags & FLAG_SPAWN:
+            count, = COUNT.unpack_from(payload, offset)
+            offset = self._read_bullets(payload, offset + COUNT.size, count)
+        if flags & FLAG_KILL:
+            count, = COUNT.unpack_from(payload, offset)
+            offset += COUNT.size
+            for _ in range(count):
+                bullet_id, = BULLET_ID.unpack_from(payload, offset)
+                offset += BULLET_ID.size
+                self.bullets.pop(bullet_id, None)
+    
+    def _read_bullets(self, payload, offset, count):
+        for _ in range(count):
+            bullet_id, kind, x, y = BULLET.unpack_from(payload, offset)
+            offset += BULLET.size
+            self.bullets[bullet_id] = [kind, x, y]
+        return offset
+    
+    def _advance_bullets(self, ticks):
+        for bullet in self.bullets.values():
+            bullet[2] += (-BULLET_SPEED if bullet[0] == PLAYER_BULLET else BULLET_SPEED) * ticks
+    
+    def render(self, surface):
+        """Draw the reconstructed state onto a surface"""
+        surface.fill(BLACK)
+        blits = []
+        offset_x, offset_y = self.offset
+        for row in range(ENEMY_ROWS):
+            for col in range(ENEMY_COLS):
+                if self.occupancy >> (row * ENEMY_COLS + col) & 1:
+                    x, y = grid_position(row, col)
+                    blits.append((shared_enemy_image(enemy_kind(row)), (x + offset_x, y + offset_y)))
+        for kind, x, y in self.bullets.values():
+            image = shared_bullet_image('artwork', kind == PLAYER_BULLET)
+            blits.append((image, image.get_rect(center=(x, y))))
+        player_image = shared_player_image()
+        player_rect = player_image.get_rect(centerx=self.player_x, bottom=PLAYER_START_Y)
+        blits.append((player_image, player_rect))
+        surface.blits(blits, doreturn=False)
+
+class SpectatorClient:
+    """Connects to a spectator server and keeps a SpectatorState up to date"""
+    def __init__(self, host=SPECTATOR_HOST, port=SPECTATOR_PORT):
+        self.host = host
+        self.port = port
+        self.state = SpectatorState()
+        self.messages = 0
+        self.bytes_received = 0
+    
+    async def run(self, on_message=None, max_messages=None):
+        """Receive and apply messages until the server disconnects (or max_messages)"""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            while max_messages is None or self.messages < max_messages:
+                header = await reader.readexactly(LENGTH.size)
+                length, = LENGTH.unpack(header)
+                payload = await reader.readexactly(length)
+                self.state.apply(payload)
+                self.messages += 1
+                self.bytes_received += LENGTH.size + length
+                if on_message:
+                    on_message(self.state)
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+def main():
+    """Headless spectator: rebuild the game, render it off-screen and print a status line"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    
+    host = sys.argv[1] if len(sys.argv) > 1 else SPECTATOR_HOST
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else SPECTATOR_PORT
+    client = SpectatorClient(host, port)
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    last_status = [0.0]
+    
+    def on_message(state):
+        if not state.synced:
+            return
+        state.render(surface)
+        now = time.perf_counter()
+        if now - last_status[0] >= 1.0:
+            last_status[0] = now
+            enemies = bin(state.occupancy).count('1')
+            print(f"tick {state.tick}: score {state.score}, lives {state.lives}, "
+                  f"{enemies} enemies, {len(state.bullets)} bullets, {client.bytes_received} bytes received")
+    
+    try:
+        asyncio.run(client.run(on_message))
+    except KeyboardInterrupt:
+        pass
+    except ConnectionError as e:
+        print(f"Could not connect to {host}:{port}: {e}")
+    pygame.image.save(surface, 'spectator.png')
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark of spectator clients served against game-process CPU cost.
+
+Run with ``python spectator_benchmark.py``. A scripted headless game runs at
+FPS with the spectator server, while a separate process connects the
+clients over loopback, so the CPU time measured here is only what the game
+process pays for tracking, encoding and sending.
+"""
+import os
+import time
+import asyncio
+import multiprocessing
+
+# Surfaces and transforms work without a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from constants import *
+from player import Player
+from projectile import Projectile
+from enemy import EnemyFormation
+from rng import RandomStreams
+from spectator import SpectatorServer, SpectatorClient, StateTracker
+
+CLIENT_COUNTS = [0, 1, 10, 50, 100]
+BENCHMARK_TICKS = 300
+BENCHMARK_SEED = 1234
+
+def run_clients(port, count, results):
+    """Client process: connect ``count`` spectators and report their final state"""
+    async def run_all():
+        clients = [SpectatorClient('127.0.0.1', port) for _ in range(count)]
+        outcomes = await asyncio.gather(*(client.run() for client in clients), return_exceptions=True)
+        return [(client.state.tick, client.state.occupancy, client.state.score, client.messages)
+                for client, outcome in zip(clients, outcomes) if not isinstance(outcome, Exception)]
+    results.put(asyncio.run(run_all()))
+
+def run_benchmark(client_count):
+    """Play a scripted game with ``client_count`` spectators and return the measurements"""
+    server = SpectatorServer('127.0.0.1', 0)
+    server.start()
+    tracker = StateTracker()
+    
+    results = multiprocessing.Queue()
+    client_process = None
+    if client_count:
+        client_process = multiprocessing.Process(target=run_clients, args=(server.port, client_count, results))
+        client_process.start()
+        # Let every client connect before measuring
+        deadline = time.perf_counter() + 10
+        while len(server.clients) < client_count and time.perf_counter() < deadline:
+            time.sleep(0.01)
+    
+    player = Player()
+    player_bullets = pygame.sprite.Group()
+    enemy_bullets = pygame.sprite.Group()
+    formation = EnemyFormation(RandomStreams(BENCHMARK_SEED).child(1))
+    score = 0
+    tick_time = 1 / FPS
+    
+    cpu_start = time.process_time()
+    next_tick = time.perf_counter()
+    for tick in range(BENCHMARK_TICKS):
+        if tick % 20 == 0:
+            player_bullets.add(Projectile(25 + (tick * 37) % (SCREEN_WIDTH - 50), player.rect.top))
+        player_bullets.update()
+        enemy_bullets.update()
+        formation.update(tick)
+        for x, y in formation.check_enemies_shooting():
+            enemy_bullets.add(Projectile(x, y, is_player_bullet=False))
+        score += SCORE_PER_HIT * len(pygame.sprite.groupcollide(formation.enemies, player_bullets, True, True))
+        
+        if server.clients:
+            delta = tracker.update(player, formation, player_bullets, enemy_bullets, score, PLAYER_LIVES)
+            server.publish(delta, tracker.keyframe() if server.keyframe_wanted else None)
+        
+        # Keep real-time pacing so clients see a realistic message rate
+        next_tick += tick_time
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    cpu_ms = (time.process_time() - cpu_start) * 1000
+    
+    # Give the server a moment to flush before disconnecting everyone
+    time.sleep(0.2)
+    stats = server.stats()
+    server.stop()
+    
+    in_sync = 0
+    if client_process:
+        finals = results.get(timeout=10)
+        client_process.join()
+        in_sync = sum(1 for tick, occupancy, client_score, _ in finals
+                      if tick == tracker.tick and occupancy == tracker.occupancy and client_score == tracker.score)
+    
+    return {
+        'clients': client_count,
+        'cpu_ms_per_tick': cpu_ms / BENCHMARK_TICKS,
+        'bytes_per_tick': stats['bytes_sent'] / BENCHMARK_TICKS,
+        'dropped': stats['clients_dropped'],
+        'in_sync': in_sync,
+    }
+
+def main():
+    pygame.init()
+    print(f"{'clients':>8}{'cpu/tick':>12}{'bytes/tick':>12}{'dropped':>9}{'in sync':>9}")
+    for count in CLIENT_COUNTS:
+        r = run_benchmark(count)
+        print(f"{r['clients']:>8}{r['cpu_ms_per_tick']:>9.3f} ms{r['bytes_per_tick']:>12.0f}"
+              f"{r['dropped']:>9}{r['in_sync']:>9}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from array import array
+
+class TrailBuffer:
+    """Fixed-size trail ring buffers for many bullets, stored in one shared array.
+    
+    Each bullet owns a slot of ``max_length`` (x, y) positions inside
+    ``positions``. Recording a position overwrites the oldest one once the
+    slot is full, so nothing is allocated or shifted per frame.
+    """
+    def __init__(self, max_length, capacity=64):
+        self.max_length = max_length
+        self.capacity = 0
+        self.positions = array('i')
+        self.starts = array('i')    # Index of the oldest position in each slot
+        self.counts = array('i')    # Number of stored positions in each slot
+        self.lengths = array('i')   # Trail length used by each slot
+        self.kinds = array('b')     # Afterimage kind of each slot
+        self.free_slots = []
+        self.active_slots = set()
+        self.grow(capacity)
+    
+    def grow(self, capacity):
+        """Enlarge the buffer to hold at least ``capacity`` trails"""
+        added = capacity - self.capacity
+        if added <= 0:
+            return
+        self.positions.extend(array('i', [0]) * (added * self.max_length * 2))
+        self.starts.extend(array('i', [0]) * added)
+        self.counts.extend(array('i', [0]) * added)
+        self.lengths.extend(array('i', [0]) * added)
+        self.kinds.extend(array('b', [0]) * added)
+        # Hand out low slots first
+        self.free_slots.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+    
+    def acquire(self, kind, length):
+        """Reserve a slot for a new trail and return its index"""
+        if not self.free_slots:
+            self.grow(self.capacity * 2)
+        slot = self.free_slots.pop()
+        self.starts[slot] = 0
+        self.counts[slot] = 0
+        self.lengths[slot] = min(length, self.max_length)
+        self.kinds[slot] = kind
+        self.active_slots.add(slot)
+        return slot
+    
+    def release(self, slot):
+        """Return a slot to the free list"""
+        if slot in self.active_slots:
+            self.active_slots.remove(slot)
+            self.free_slots.append(slot)
+    
+    def clear(self):
+        """Release every slot"""
+        for slot in list(self.active_slots):
+            self.release(slot)
+    
+    def record(self, slot, x, y):
+        """Append a position to a slot's trail, overwriting the oldest once full"""
+        length = self.lengths[slot]
+        count = self.counts[slot]
+        start = self.starts[slot]
+        if count < length:
+            index = (start + count) % length
+            self.counts[slot] = count + 1
+        else:
+            index = start
+            self.starts[slot] = (start + 1) % length
+        offset = (slot * self.max_length + index) * 2
+        self.positions[offset] = x
+        self.positions[offset + 1] = y
+    
+    def get(self, slot):
+        """Return a slot's positions, oldest first"""
+        length = self.lengths[slot]
+        start = self.starts[slot]
+        base = slot * self.max_length
+        positions = self.positions
+        trail = []
+        for i in range(self.counts[slot]):
+            offset = (base + (start + i) % length) * 2
+            trail.append((positions[offset], positions[offset + 1]))
+        return trail
+    
+    def blit_list(self, afterimages):
+        """Build one (image, topleft) list for drawing every trail with Surface.blits.
+        
+        ``afterimages[kind]`` is a list of (image, half_width, half_height)
+        indexed by age, where age 0 is the newest position of a trail.
+        """
+        blits = []
+        append = blits.append
+        positions = self.positions
+        max_length = self.max_length
+        starts, counts, lengths, kinds = self.starts, self.counts, self.lengths, self.kinds
+        for slot in self.active_slots:
+            count = counts[slot]
+            if not count:
+                continue
+            images = afterimages[kinds[slot]]
+            length = lengths[slot]
+            start = starts[slot]
+            base = slot * max_length
+            # Oldest first, so newer afterimages are drawn on top
+            for i in range(count):
+                offset = (base + (start + i) % length) * 2
+                image, half_width, half_height = images[count - 1 - i]
+                append((image, (positions[offset] - half_width, positions[offset + 1] - half_height)))
+        return blits